@@ -0,0 +1,74 @@
+"""
+Synthetic catalogue shared by the benchmarks (and the in-memory database
+setup the tests use too).
+"""
+import uuid
+from datetime import timedelta
+from typing import List, Sequence
+
+from documents import utcnow
+
+# Never the configured DB_NAME: the benchmarks drop this database when done
+BENCH_DB = "paula_veiga_doces_bench"
+
+CATEGORY_SLUGS = ("aniversario", "casamento", "infantil", "cha-de-bebe", "corporativo", "datas-comemorativas")
+
+
+def make_categories() -> List[dict]:
+    return [
+        {"id": f"cat-{slug}", "name": slug.replace("-", " ").title(), "slug": slug}
+        for slug in CATEGORY_SLUGS
+    ]
+
+
+def make_cakes(count: int, category_ids: Sequence[str] = ("cat-aniversario",)) -> List[dict]:
+    now = utcnow()
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Bolo {i}",
+            "description": "Massa de baunilha, recheio de brigadeiro e cobertura de ganache. " * 3,
+            "price": 150.0 + i % 100,
+            "category_id": category_ids[i % len(category_ids)],
+            "image_url": f"https://images.unsplash.com/photo-{i}?w=600",
+            "instagram_url": None,
+            "featured": i % 10 == 0,
+            "created_at": now - timedelta(seconds=i),
+        }
+        for i in range(count)
+    ]
+
+
+async def seed(db, size: int) -> List[dict]:
+    """Replace the cakes and categories in db with size synthetic cakes. Returns the categories."""
+    categories = make_categories()
+    await db.categories.delete_many({})
+    await db.categories.insert_many([dict(category) for category in categories])
+    await db.cakes.delete_many({})
+    if size:
+        await db.cakes.insert_many(make_cakes(size, [category["id"] for category in categories]))
+    return categories
+
+
+def mongomock_indexes(models: list) -> list:
+    """The index models mongomock can build.
+
+    It ignores partialFilterExpression (every cake without an
+    instagram_url would collide) and text index weights.
+    """
+    return [
+        model for model in models
+        if "partialFilterExpression" not in model.document and "weights" not in model.document
+    ]
+
+
+def use_mongomock():
+    """Point server at an in-memory mongomock database instead of MONGODB_URL."""
+    import indexes
+    import server
+    from mongomock_motor import AsyncMongoMockClient
+
+    server.client = AsyncMongoMockClient(tz_aware=True)
+    for collection, models in indexes.INDEXES.items():
+        indexes.INDEXES[collection] = mongomock_indexes(models)
+    server.db = server.client[BENCH_DB]
@@ -0,0 +1,105 @@
+"""
+Benchmark encoding GET /api/cakes pages with and without FAST_JSON.
+
+Seeds 100, 1,000 and 10,000 cakes into a throwaway database and loads
+the whole catalogue once, page by page (limit=200), the way the route
+does. It then times what a cache miss in catalogue_response pays for
+those pages:
+
+- standard: validation against the route's response_model, then encoding;
+- fast_json: orjson encoding of the documents as loaded.
+
+MongoDB and the response cache are left out, and so is compression: both
+paths compress the same bytes.
+
+    cd backend
+    python -m benchmarks.json_encoding [--sizes 100 1000] [--duration 5] [--mongomock]
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable, List
+
+from fastapi.routing import APIRoute, serialize_response
+
+import server
+from benchmarks.catalogue import BENCH_DB, make_cakes, use_mongomock
+from pagination import MAX_PAGE_SIZE
+
+
+async def load_catalogue() -> List[dict]:
+    """Every page of the default listing, as the route's loader returns them."""
+    pages, cursor = [], None
+    while True:
+        page = await server.load_cake_page({}, MAX_PAGE_SIZE, cursor)
+        page["facets"] = None
+        pages.append(page)
+        cursor = page["next_cursor"]
+        if not cursor:
+            return pages
+
+
+def cakes_response_field():
+    route = next(
+        route for route in server.app.routes
+        if isinstance(route, APIRoute) and route.path == "/api/cakes" and "GET" in route.methods
+    )
+    return route.secure_cloned_response_field
+
+
+async def measure(encode: Callable[[dict], Awaitable[bytes]], pages: List[dict], duration: float) -> dict:
+    for page in pages:  # warm up
+        await encode(page)
+    encoded, started = 0, time.perf_counter()
+    while time.perf_counter() - started < duration:
+        for page in pages:
+            await encode(page)
+        encoded += len(pages)
+    elapsed = time.perf_counter() - started
+    return {"pages": encoded, "pages_per_sec": round(encoded / elapsed, 1)}
+
+
+async def main(sizes, duration: float, mongomock: bool = False):
+    results = []
+    if mongomock:
+        use_mongomock()
+    else:
+        server.connect(BENCH_DB)
+    field = cakes_response_field()
+
+    async def standard(page: dict) -> bytes:
+        return server.dumps(await serialize_response(field=field, response_content=page))
+
+    async def fast(page: dict) -> bytes:
+        return server.dumps(page)
+
+    try:
+        for size in sizes:
+            await server.db.cakes.delete_many({})
+            await server.db.cakes.insert_many(make_cakes(size))
+            server.mark_changed("cakes")
+            pages = await load_catalogue()
+            # Same output either way, or the comparison means nothing
+            assert [json.loads(await standard(page)) for page in pages] == \
+                [json.loads(await fast(page)) for page in pages]
+            standard_result = await measure(standard, pages, duration)
+            fast_result = await measure(fast, pages, duration)
+            results.append({
+                "documents": size,
+                "standard": standard_result,
+                "fast_json": fast_result,
+                "speedup": round(fast_result["pages_per_sec"] / standard_result["pages_per_sec"], 2),
+            })
+    finally:
+        await server.client.drop_database(BENCH_DB)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per encoder and size")
+    parser.add_argument("--mongomock", action="store_true", help="use an in-memory mongomock database")
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.duration, args.mongomock))
@@ -0,0 +1,231 @@
+"""
+Load test for the public API.
+
+Boots server:app with uvicorn on a free local port, seeds a synthetic
+catalogue into a throwaway database (a local MongoDB, or mongomock with
+--mongomock), then drives concurrent load on each scenario in turn and
+prints latency percentiles and throughput as JSON:
+
+    cd backend
+    python -m benchmarks.load [--sizes 100 1000] [--concurrency 16] [--duration 10]
+                              [--scenarios cakes categories] [--mongomock] [--output before.json]
+
+Client and server share one process and event loop, so the absolute
+numbers understate a real deployment; they are meant for comparing
+commits on the same machine. Uploads go to a temporary directory that
+is removed afterwards.
+"""
+import argparse
+import atexit
+import asyncio
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from contextlib import AsyncExitStack
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import uvicorn
+from PIL import Image
+
+# Blob storage is configured when server is imported: point it at a
+# throwaway directory first
+UPLOAD_DIR = tempfile.mkdtemp(prefix="paula-veiga-bench-")
+atexit.register(shutil.rmtree, UPLOAD_DIR, ignore_errors=True)
+os.environ["BLOB_BACKEND"] = "local"
+os.environ["BLOB_STORAGE_PATH"] = UPLOAD_DIR
+
+import server  # noqa: E402
+from benchmarks.catalogue import BENCH_DB, seed, use_mongomock  # noqa: E402
+
+SCENARIOS = ("cakes", "categories", "login", "upload")
+ADMIN_EMAIL = "admin@paulaveiga.com"
+ADMIN_PASSWORD = "senha123"
+WARMUP_SECONDS = 1.0
+# Distinct images, so uploads are not all deduplicated by content hash
+UPLOAD_POOL_SIZE = 512
+
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+Scenario = Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]
+
+
+def make_images(count: int, seed_value: int) -> List[bytes]:
+    rng = random.Random(seed_value)
+    images = []
+    for _ in range(count):
+        color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+        buffer = io.BytesIO()
+        Image.new("RGB", (640, 480), color).save(buffer, "JPEG", quality=85)
+        images.append(buffer.getvalue())
+    return images
+
+
+def build_scenarios(categories: List[dict], token: str, images: List[bytes], rng: random.Random) -> Dict[str, Scenario]:
+    category_ids = [category["id"] for category in categories]
+    auth = {"Authorization": f"Bearer {token}"}
+    uploads = iter(range(10 ** 9))
+
+    def cakes(http):
+        # A mix of what the gallery asks for
+        params = rng.choice([
+            {},
+            {"category_id": rng.choice(category_ids)},
+            {"featured": "true"},
+            {"sort": "price_asc"},
+        ])
+        return http.get("/api/cakes", params={"limit": 24, **params})
+
+    def categories_(http):
+        return http.get("/api/categories")
+
+    def login(http):
+        return http.post("/api/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+
+    def upload(http):
+        image = images[next(uploads) % len(images)]
+        return http.post("/api/upload", files={"file": ("bolo.jpg", image, "image/jpeg")}, headers=auth)
+
+    return {"cakes": cakes, "categories": categories_, "login": login, "upload": upload}
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of already sorted values."""
+    index = max(0, -(-len(values) * p // 100) - 1)
+    return values[int(index)]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    latencies = sorted(latencies)
+    summary = {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+    }
+    if latencies:
+        summary["latency_ms"] = {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "max": round(latencies[-1] * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2),
+        }
+    return summary
+
+
+async def drive(base_url: str, scenario: Scenario, concurrency: int, duration: float) -> dict:
+    """Run scenario from concurrency workers for duration seconds."""
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(http: httpx.AsyncClient):
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                response = await scenario(http)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    # A client (and connection) per worker, like separate visitors; a
+    # shared httpx pool can stall one request for the whole run
+    async with AsyncExitStack() as stack:
+        clients = [await stack.enter_async_context(httpx.AsyncClient(base_url=base_url, timeout=30))
+                   for _ in range(concurrency)]
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(http) for http in clients))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def start_server() -> Tuple[uvicorn.Server, asyncio.Task]:
+    config = uvicorn.Config(server.app, host="127.0.0.1", port=0, log_level="warning", access_log=False)
+    uv_server = uvicorn.Server(config)
+    # Let Ctrl+C reach asyncio.run instead of uvicorn's graceful shutdown
+    uv_server.install_signal_handlers = lambda: None
+    task = asyncio.create_task(uv_server.serve())
+    while not uv_server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return uv_server, task
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args) -> dict:
+    if args.mongomock:
+        use_mongomock()
+    else:
+        server.connect(BENCH_DB)
+    rng = random.Random(args.seed)
+    images = make_images(UPLOAD_POOL_SIZE, args.seed) if "upload" in args.scenarios else []
+
+    report = {
+        "commit": current_commit(),
+        "database": "mongomock" if args.mongomock else "mongodb",
+        "concurrency": args.concurrency,
+        "duration_seconds": args.duration,
+        "results": [],
+    }
+    uv_server, serving = await start_server()
+    port = uv_server.servers[0].sockets[0].getsockname()[1]
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        # The startup hook has created the default admin by now
+        async with httpx.AsyncClient(base_url=base_url) as http:
+            response = await http.post("/api/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+            response.raise_for_status()
+            token = response.json()["access_token"]
+        for size in args.sizes:
+            categories = await seed(server.db, size)
+            server.mark_changed("cakes", "categories")
+            scenarios = build_scenarios(categories, token, images, rng)
+            endpoints = {}
+            for name in args.scenarios:
+                await drive(base_url, scenarios[name], args.concurrency, WARMUP_SECONDS)
+                endpoints[name] = await drive(base_url, scenarios[name], args.concurrency, args.duration)
+                # Variant rendering would otherwise spill into the next scenario
+                await server.image_pipeline.drain()
+            report["results"].append({"documents": size, "scenarios": endpoints})
+    finally:
+        await server.client.drop_database(BENCH_DB)
+        uv_server.should_exit = True
+        await serving
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000], help="cakes in the catalogue")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, default=16, help="simultaneous clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per scenario and size")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for request mix and images")
+    parser.add_argument("--mongomock", action="store_true", help="use an in-memory mongomock database")
+    parser.add_argument("--output", type=Path, help="also write the report to this file")
+    args = parser.parse_args()
+    report = json.dumps(asyncio.run(main(args)), indent=2)
+    if args.output:
+        args.output.write_text(report + "\n")
+    print(report)
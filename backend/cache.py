@@ -0,0 +1,230 @@
+"""
+In-memory read-through cache for public catalogue responses.
+
+Entries are grouped by namespace (one per collection: "cakes",
+"categories"...) and keyed by the request's query parameters. Write
+routes invalidate the namespaces they touch, and SharedInvalidations
+relays that to the other server processes; a TTL bounds staleness for
+anything that changes behind the API's back (manual edits). Memory is
+bounded by the approximate JSON size of the entries, evicting least
+recently used first.
+"""
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    nbytes = getattr(value, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    return len(json.dumps(value, default=str))
+
+
+class ResponseCache:
+    def __init__(self, ttl: float = 60.0, max_bytes: int = 32 * 1024 * 1024):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        # (namespace, key) -> (expires_at, size, value)
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, int, Any]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self._loading: Dict[Tuple[str, Hashable], asyncio.Future] = {}
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, namespace: str, key: Hashable, default: Any = None) -> Any:
+        entry = self._entries.get((namespace, key))
+        if entry is None:
+            return default
+        expires_at, size, value = entry
+        if expires_at < time.monotonic():
+            self._remove((namespace, key))
+            return default
+        self._entries.move_to_end((namespace, key))
+        return value
+
+    def set(self, namespace: str, key: Hashable, value: Any, size: Optional[int] = None):
+        size = estimate_size(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        self._remove((namespace, key))
+        self._entries[(namespace, key)] = (time.monotonic() + self.ttl, size, value)
+        self.current_bytes += size
+        while self.current_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def delete(self, namespace: str, key: Hashable):
+        # Bumps the generation too, so a load already in flight for the key
+        # doesn't put back what it read before the delete
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        self._remove((namespace, key))
+
+    def invalidate(self, *namespaces: str):
+        """Drop every entry of the given namespaces (all of them if none given)."""
+        if namespaces:
+            targets = set(namespaces)
+        else:
+            targets = {ns for ns, _ in self._entries} | {ns for ns, _ in self._loading} | set(self._generations)
+        for namespace in targets:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+        for entry_key in [k for k in self._entries if k[0] in targets]:
+            self._remove(entry_key)
+        self.invalidations += 1
+
+    def clear(self):
+        self.invalidate()
+
+    async def get_or_load(self, namespace: str, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value, or run loader once (even under concurrent misses) and cache it."""
+        value = self.get(namespace, key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+        self.misses += 1
+
+        in_flight = self._loading.get((namespace, key))
+        if in_flight is not None:
+            return await asyncio.shield(in_flight)
+
+        generation = self._generations.get(namespace, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._loading[(namespace, key)] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else awaited isn't logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._loading.pop((namespace, key), None)
+        future.set_result(value)
+        # A write that landed while loading makes this value stale: don't keep it
+        if self._generations.get(namespace, 0) == generation:
+            self.set(namespace, key, value)
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _remove(self, entry_key):
+        entry = self._entries.pop(entry_key, None)
+        if entry is not None:
+            self.current_bytes -= entry[1]
+
+
+class SharedInvalidations:
+    """Relays invalidations between server processes through one MongoDB document.
+
+    publish() increments a counter per namespace. Every process reads the
+    document every `interval` seconds and passes the namespaces whose
+    counter moved to `on_change`, so a write on one worker reaches the
+    caches of the others within about a second rather than a TTL.
+    """
+
+    DOCUMENT_ID = "invalidations"
+
+    def __init__(self, on_change: Callable[[List[str]], None], interval: float = 1.0):
+        self.on_change = on_change
+        self.interval = interval
+        self.db = None
+        self._seen: Dict[str, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._publishing: Set[asyncio.Task] = set()
+
+    async def start(self, db):
+        self.db = db
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._poll())
+        # Whatever changed before this process started is not in its caches
+        self._seen = await self._versions()
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._publishing:
+            await asyncio.gather(*self._publishing, return_exceptions=True)
+
+    def publish(self, *namespaces: str):
+        """Tell the other processes; callers have already invalidated their own caches."""
+        if self.db is None or not namespaces:
+            return
+        try:
+            task = asyncio.get_running_loop().create_task(self._publish(namespaces))
+        except RuntimeError:
+            # No event loop (maintenance scripts): nothing is serving from a cache
+            return
+        self._publishing.add(task)
+        task.add_done_callback(self._publishing.discard)
+
+    async def sync(self) -> List[str]:
+        """Apply changes published since the last sync. Returns the changed namespaces."""
+        versions = await self._versions()
+        changed = [namespace for namespace, version in versions.items() if self._seen.get(namespace) != version]
+        self._seen.update(versions)
+        if changed:
+            self.on_change(changed)
+        return changed
+
+    async def _versions(self) -> Dict[str, int]:
+        doc = await self.db.cache_invalidations.find_one({"_id": self.DOCUMENT_ID})
+        return dict((doc or {}).get("versions", {}))
+
+    async def _publish(self, namespaces):
+        try:
+            doc = await self.db.cache_invalidations.find_one_and_update(
+                {"_id": self.DOCUMENT_ID},
+                {"$inc": {f"versions.{namespace}": 1 for namespace in set(namespaces)}},
+                upsert=True, return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            logger.error(f"Could not publish cache invalidation: {str(e)}")
+            return
+        # Our own bump needn't come back through on_change; one from another
+        # process in between must
+        versions = doc.get("versions", {})
+        for namespace in set(namespaces):
+            if versions.get(namespace) == self._seen.get(namespace, 0) + 1:
+                self._seen[namespace] = versions[namespace]
+
+    async def _poll(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync()
+            except Exception as e:
+                logger.error(f"Could not read cache invalidations: {str(e)}")
@@ -0,0 +1,196 @@
+"""
+gzip / brotli response compression.
+
+CompressionMiddleware negotiates Accept-Encoding and compresses text and
+JSON responses above a size threshold as they are sent. Catalogue
+responses served from the cache are compressed ahead of time instead
+(PrecompressedBody), at a higher level, so the work is done once per
+write rather than once per request; the middleware leaves responses that
+already carry a Content-Encoding alone. Brotli is used when the brotli
+package is installed, gzip otherwise.
+"""
+import gzip
+import zlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Preferred first when the client accepts both equally
+AVAILABLE_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+COMPRESSIBLE_TYPES = ("application/json", "application/javascript", "image/svg+xml", "text/")
+
+# On the fly: cheap levels. Ahead of time: the cost is paid once per write
+STREAM_GZIP_LEVEL = 6
+STREAM_BROTLI_QUALITY = 4
+PRECOMPRESS_GZIP_LEVEL = 9
+PRECOMPRESS_BROTLI_QUALITY = 9
+
+
+def negotiate(accept_encoding: Optional[str], available: Iterable[str] = AVAILABLE_ENCODINGS) -> Optional[str]:
+    """Pick the best available encoding for an Accept-Encoding header, or None for identity."""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(data: bytes, encoding: str, level: Optional[int] = None) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=STREAM_BROTLI_QUALITY if level is None else level)
+    return gzip.compress(data, compresslevel=STREAM_GZIP_LEVEL if level is None else level, mtime=0)
+
+
+def vary_on_accept_encoding(headers: MutableHeaders):
+    if "accept-encoding" not in headers.get("vary", "").lower():
+        headers.add_vary_header("Accept-Encoding")
+
+
+def is_compressible(content_type: str) -> bool:
+    return any(content_type.startswith(prefix) for prefix in COMPRESSIBLE_TYPES)
+
+
+class _StreamCompressor:
+    def __init__(self, encoding: str):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=STREAM_BROTLI_QUALITY)
+            self._zlib = None
+        else:
+            self._brotli = None
+            # wbits=31: zlib stream with a gzip header and trailer
+            self._zlib = zlib.compressobj(STREAM_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._brotli.process(data) if self._brotli else self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        return self._brotli.finish() if self._brotli else self._zlib.flush()
+
+
+class PrecompressedBody:
+    """An encoded response body plus its compressed forms, built once and served many times."""
+
+    def __init__(self, body: bytes, media_type: str = "application/json", minimum_size: int = 1024):
+        self.body = body
+        self.media_type = media_type
+        self.encoded: Dict[str, bytes] = {}
+        if len(body) >= minimum_size:
+            for encoding in AVAILABLE_ENCODINGS:
+                level = PRECOMPRESS_BROTLI_QUALITY if encoding == "br" else PRECOMPRESS_GZIP_LEVEL
+                self.encoded[encoding] = compress(body, encoding, level)
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+    def response(self, accept_encoding: Optional[str], headers: Optional[List[Tuple[bytes, bytes]]] = None) -> Response:
+        encoding = negotiate(accept_encoding, self.encoded) if self.encoded else None
+        response = Response(self.encoded[encoding] if encoding else self.body, media_type=self.media_type)
+        if headers:
+            response.headers.raw.extend(headers)
+        if self.encoded:
+            vary_on_accept_encoding(response.headers)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        return response
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self.app, encoding, self.minimum_size)(scope, receive, send)
+
+
+class _CompressionResponder:
+    def __init__(self, app: ASGIApp, encoding: str, minimum_size: int):
+        self.app = app
+        self.encoding = encoding
+        self.minimum_size = minimum_size
+        self.send: Send = None
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_StreamCompressor] = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.send = send
+        await self.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message):
+        if message["type"] == "http.response.start":
+            # Hold the headers until the first body chunk shows how big the response is
+            self.start_message = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.start_message is not None:
+            start, self.start_message = self.start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            skip = (
+                "content-encoding" in headers
+                or start["status"] < 200 or start["status"] in (204, 304)
+                or not is_compressible(headers.get("content-type", ""))
+                or (not more_body and len(body) < self.minimum_size)
+            )
+            if skip:
+                self.passthrough = True
+                await self.send(start)
+                await self.send(message)
+                return
+
+            headers["Content-Encoding"] = self.encoding
+            vary_on_accept_encoding(headers)
+            if not more_body:
+                body = compress(body, self.encoding)
+                headers["Content-Length"] = str(len(body))
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": body})
+                return
+            # Streaming: length unknown until the last chunk
+            del headers["Content-Length"]
+            self.compressor = _StreamCompressor(self.encoding)
+            await self.send(start)
+
+        data = self.compressor.compress(body)
+        if not more_body:
+            data += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
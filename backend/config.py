@@ -3,14 +3,38 @@ Configuration file for Paula Veiga Doces API
 Handles environment-based settings
 """
 import os
-from typing import List
+from pathlib import Path
+from typing import List, Optional
+
+from dotenv import load_dotenv
+
+# Before Settings reads os.environ; real environment variables still win
+load_dotenv(Path(__file__).parent / '.env')
 
 class Settings:
-    # MongoDB
-    MONGODB_URL: str = os.environ.get(
-        'MONGODB_URL',
-        'mongodb://localhost:27017/paula_veiga_doces'
+    # MongoDB (MONGO_URL is the name older deployments used)
+    MONGODB_URL: str = (
+        os.environ.get('MONGODB_URL')
+        or os.environ.get('MONGO_URL')
+        or 'mongodb://localhost:27017/paula_veiga_doces'
     )
+    # Defaults to the database named in MONGODB_URL
+    DB_NAME: Optional[str] = os.environ.get('DB_NAME') or None
+    
+    # Connections per server process (each worker has its own pool; one
+    # event loop rarely has more than a couple dozen queries in flight)
+    MONGO_MAX_POOL_SIZE: int = int(os.environ.get('MONGO_MAX_POOL_SIZE', '25'))
+    MONGO_MIN_POOL_SIZE: int = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+    # 0 = keep idle connections open
+    MONGO_MAX_IDLE_TIME_MS: int = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', '0'))
+    MONGO_CONNECT_TIMEOUT_MS: int = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '10000'))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+    # 0 = no socket timeout
+    MONGO_SOCKET_TIMEOUT_MS: int = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '0'))
+    # Wire compression in order of preference, e.g. "zstd,snappy,zlib"
+    # (zstd needs the zstandard package, snappy python-snappy)
+    MONGO_COMPRESSORS: str = os.environ.get('MONGO_COMPRESSORS', '')
+    MONGO_READ_PREFERENCE: str = os.environ.get('MONGO_READ_PREFERENCE', 'primary')
     
     # CORS
     CORS_ORIGINS: List[str] = os.environ.get(
@@ -25,6 +49,65 @@ class Settings:
         'JWT_SECRET',
         'sua-chave-secreta-muito-segura-em-producao'
     )
+    # Verified admins are cached this long; revocations reach other
+    # server processes within the TTL
+    AUTH_CACHE_TTL_SECONDS: float = float(os.environ.get('AUTH_CACHE_TTL_SECONDS', '30'))
+    AUTH_CACHE_MAX_BYTES: int = int(os.environ.get('AUTH_CACHE_MAX_BYTES', str(256 * 1024)))
+    
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+    PASSWORD_HASH_WORKERS: int = int(os.environ.get('PASSWORD_HASH_WORKERS', '4'))
+    PASSWORD_HASH_MAX_PENDING: int = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '64'))
+    
+    # Instagram Graph API
+    INSTAGRAM_GRAPH_URL: str = os.environ.get('INSTAGRAM_GRAPH_URL', 'https://graph.instagram.com')
+    INSTAGRAM_TIMEOUT: float = float(os.environ.get('INSTAGRAM_TIMEOUT', '10'))
+    INSTAGRAM_MAX_RETRIES: int = int(os.environ.get('INSTAGRAM_MAX_RETRIES', '3'))
+    # 0 disables the periodic incremental sync
+    INSTAGRAM_SYNC_INTERVAL_MINUTES: int = int(os.environ.get('INSTAGRAM_SYNC_INTERVAL_MINUTES', '0'))
+    
+    # Background jobs
+    JOB_POLL_INTERVAL: float = float(os.environ.get('JOB_POLL_INTERVAL', '5'))
+    # A running job whose runner has not renewed its lease for this long
+    # (crashed or restarted process) is requeued
+    JOB_LEASE_SECONDS: float = float(os.environ.get('JOB_LEASE_SECONDS', '120'))
+    
+    # Response cache (public catalogue endpoints)
+    CACHE_TTL_SECONDS: float = float(os.environ.get('CACHE_TTL_SECONDS', '60'))
+    # How often each process picks up other processes' writes; 0 = never
+    # (one process only)
+    CACHE_SYNC_INTERVAL: float = float(os.environ.get('CACHE_SYNC_INTERVAL', '1'))
+    CACHE_MAX_BYTES: int = int(os.environ.get('CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+    
+    # Encode catalogue reads with orjson, skipping response_model re-validation
+    FAST_JSON: bool = os.environ.get('FAST_JSON', 'False').lower() == 'true'
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_SIZE: int = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+    
+    # Per-route and MongoDB metrics at /api/metrics
+    METRICS_ENABLED: bool = os.environ.get('METRICS_ENABLED', 'True').lower() == 'true'
+    
+    # Request profiler (off by default): samples PROFILE_SAMPLE_RATE of the
+    # requests plus any slower than PROFILE_SLOW_MS (0 = sampling only)
+    PROFILING_ENABLED: bool = os.environ.get('PROFILING_ENABLED', 'False').lower() == 'true'
+    PROFILE_SAMPLE_RATE: float = float(os.environ.get('PROFILE_SAMPLE_RATE', '0.01'))
+    PROFILE_SLOW_MS: float = float(os.environ.get('PROFILE_SLOW_MS', '1000'))
+    PROFILE_INTERVAL_MS: float = float(os.environ.get('PROFILE_INTERVAL_MS', '5'))
+    PROFILE_KEEP: int = int(os.environ.get('PROFILE_KEEP', '50'))
+    
+    # Image storage
+    BLOB_BACKEND: str = os.environ.get('BLOB_BACKEND', 'local')
+    BLOB_STORAGE_PATH: str = os.environ.get(
+        'BLOB_STORAGE_PATH',
+        str(Path(__file__).parent / 'uploads')
+    )
+    S3_BUCKET: Optional[str] = os.environ.get('S3_BUCKET')
+    S3_PREFIX: str = os.environ.get('S3_PREFIX', 'images/')
+    S3_ENDPOINT_URL: Optional[str] = os.environ.get('S3_ENDPOINT_URL')
+    S3_REGION: Optional[str] = os.environ.get('S3_REGION')
+    
+    # Image variants
+    IMAGE_WORKERS: int = int(os.environ.get('IMAGE_WORKERS', '2'))
     
     # App
     APP_NAME: str = 'Paula Veiga Doces API'
@@ -32,9 +115,8 @@ class Settings:
     
     # Server
     API_PREFIX: str = '/api'
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
+    # uvicorn worker processes for `manage.py serve`; 0 = one per CPU
+    # (within the container's CPU quota), at most 4
+    WEB_CONCURRENCY: int = int(os.environ.get('WEB_CONCURRENCY', '0'))
 
 settings = Settings()
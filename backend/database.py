@@ -0,0 +1,98 @@
+"""
+MongoDB client construction.
+
+The Motor client is built from Settings when the app starts (manage.py
+and the benchmarks build their own), never at import time. Each uvicorn
+worker gets its own pool, created on the event loop that uses it.
+PoolStats is a pymongo ConnectionPoolListener that keeps the connection
+counts reported by GET /api/health, so the health check never has to
+query a collection.
+"""
+import threading
+from typing import Sequence
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+DEFAULT_DB_NAME = "paula_veiga_doces"
+
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Connection counts across a client's pools (one per server)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"open": 0, "in_use": 0, "waiting": 0, "created": 0, "check_out_failures": 0, "clears": 0}
+
+    def _add(self, **deltas: int):
+        with self._lock:
+            for name, delta in deltas.items():
+                self._counts[name] += delta
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        counts["idle"] = counts["open"] - counts["in_use"]
+        return counts
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._add(clears=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._add(open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._add(open=-1)
+
+    def connection_check_out_started(self, event):
+        self._add(waiting=1)
+
+    def connection_check_out_failed(self, event):
+        self._add(waiting=-1, check_out_failures=1)
+
+    def connection_checked_out(self, event):
+        self._add(waiting=-1, in_use=1)
+
+    def connection_checked_in(self, event):
+        self._add(in_use=-1)
+
+
+def client_options(settings) -> dict:
+    options = {
+        # Dates are stored as BSON dates and read back as aware UTC datetimes
+        "tz_aware": True,
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS or None,
+        "connectTimeoutMS": settings.MONGO_CONNECT_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "socketTimeoutMS": settings.MONGO_SOCKET_TIMEOUT_MS or None,
+        "readPreference": settings.MONGO_READ_PREFERENCE,
+    }
+    if settings.MONGO_COMPRESSORS:
+        # pymongo warns about and skips compressors whose package is missing
+        options["compressors"] = settings.MONGO_COMPRESSORS
+    return options
+
+
+def create_client(settings, event_listeners: Sequence = ()) -> AsyncIOMotorClient:
+    return AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=list(event_listeners), **client_options(settings))
+
+
+def default_database(client: AsyncIOMotorClient, settings) -> AsyncIOMotorDatabase:
+    """DB_NAME if set, else the database named in MONGODB_URL, else paula_veiga_doces."""
+    if settings.DB_NAME:
+        return client[settings.DB_NAME]
+    return client.get_default_database(DEFAULT_DB_NAME)
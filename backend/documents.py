@@ -0,0 +1,90 @@
+"""
+Conversion between API models and MongoDB documents.
+
+Dates are stored as native BSON dates (the Mongo client is created with
+tz_aware=True, so they come back as aware UTC datetimes), which lets
+sorting and range queries use indexes and lets read paths hand documents
+straight to serialisation. Older databases stored ISO strings;
+migrate_dates() converts them in place.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Tuple, Type
+
+from pydantic import BaseModel
+from pymongo import UpdateOne
+
+# Date fields per collection, as written by the API
+DATE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "admins": ("created_at",),
+    "categories": ("created_at",),
+    "cakes": ("created_at",),
+    "testimonials": ("created_at",),
+    "settings": ("updated_at", "instagram_last_media_at"),
+    "jobs": ("created_at", "started_at", "finished_at"),
+}
+
+_MIGRATION_BATCH_SIZE = 500
+
+
+def utcnow() -> datetime:
+    # BSON dates have millisecond precision; truncate so values round-trip unchanged
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def to_document(model: BaseModel) -> dict:
+    """Dump a model for storage: native datetimes, no computed fields."""
+    return model.model_dump(exclude=set(type(model).model_computed_fields))
+
+
+def projection_for(model: Type[BaseModel]) -> dict:
+    """Find projection returning exactly the model's stored fields."""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+
+def apply_defaults(model: Type[BaseModel], doc: dict) -> dict:
+    """Fill fields missing from an older document with the model's defaults."""
+    for name, field in model.model_fields.items():
+        if name not in doc and not field.is_required():
+            doc[name] = field.get_default(call_default_factory=True)
+    return doc
+
+
+def _parse(value: str):
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def migrate_dates(db, dry_run: bool = False) -> Dict[str, int]:
+    """Rewrite ISO-string date fields as BSON dates. Returns converted documents per collection."""
+    converted = {}
+    for collection_name, fields in DATE_FIELDS.items():
+        collection = db[collection_name]
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        projection = {"_id": 1, **{field: 1 for field in fields}}
+        count = 0
+        batch = []
+        async for doc in collection.find(query, projection):
+            update = {}
+            for field in fields:
+                if isinstance(doc.get(field), str):
+                    parsed = _parse(doc[field])
+                    if parsed is not None:
+                        update[field] = parsed
+            if not update:
+                continue
+            count += 1
+            batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": update}))
+            if len(batch) >= _MIGRATION_BATCH_SIZE:
+                if not dry_run:
+                    await collection.bulk_write(batch, ordered=False)
+                batch = []
+        if batch and not dry_run:
+            await collection.bulk_write(batch, ordered=False)
+        converted[collection_name] = count
+    return converted
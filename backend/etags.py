@@ -0,0 +1,105 @@
+"""
+Conditional GET support (ETag / Last-Modified) for catalogue endpoints.
+
+Each collection has a version counter that write routes bump. The ETag
+of a response is derived from that version and the request's query key,
+so an If-None-Match can be answered with 304 before touching Mongo or
+serialising anything. ETags also carry a per-process epoch (versions are
+in-memory, so two server processes must never produce the same tag for
+different data) and a time window of `ttl` seconds, which bounds how
+long a process can keep confirming a tag after another process wrote.
+
+The tags are weak: the same data is sent gzip, brotli or uncompressed
+depending on Accept-Encoding, so the bytes behind one tag differ.
+"""
+import hashlib
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Hashable, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+
+class CollectionVersions:
+    def __init__(self, ttl: float = 60.0):
+        self.ttl = ttl
+        self.epoch = uuid.uuid4().hex[:8]
+        self._versions: Dict[str, int] = {}
+        self._started_at = datetime.now(timezone.utc).replace(microsecond=0)
+        self._modified: Dict[str, datetime] = {}
+
+    def bump(self, *collections: str):
+        # HTTP dates have 1s resolution: round up, and keep every bump strictly
+        # later than the previous one, so two writes in the same second never
+        # share a Last-Modified value
+        now = (datetime.now(timezone.utc) + timedelta(seconds=1)).replace(microsecond=0)
+        for collection in collections:
+            self._versions[collection] = self._versions.get(collection, 0) + 1
+            previous = self._modified.get(collection)
+            self._modified[collection] = max(now, previous + timedelta(seconds=1)) if previous else now
+
+    def version(self, collection: str) -> int:
+        return self._versions.get(collection, 0)
+
+    def _window(self) -> int:
+        return int(time.time() // self.ttl) if self.ttl > 0 else 0
+
+    def last_modified(self, collection: str) -> datetime:
+        modified = self._modified.get(collection, self._started_at)
+        if self.ttl > 0:
+            # Same bound as the ETag window: never older than the current window
+            window_start = datetime.fromtimestamp(self._window() * self.ttl, timezone.utc)
+            modified = max(modified, window_start.replace(microsecond=0))
+        return modified
+
+    def etag(self, collection: str, key: Hashable) -> str:
+        window = self._window()
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()[:10]
+        return f'W/"{self.epoch}-{window}-{collection}-{self.version(collection)}-{digest}"'
+
+
+def _opaque(tag: str) -> str:
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison: ignore any W/ prefix
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return any(_opaque(tag) == _opaque(etag) for tag in candidates)
+
+
+def conditional_get(request: Request, response: Response, versions: CollectionVersions,
+                    collection: str, key: Hashable) -> Optional[Response]:
+    """Set validators on response; return a 304 response if the client's copy is current."""
+    etag = versions.etag(collection, key)
+    last_modified = versions.last_modified(collection)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        # Let browsers store the response but revalidate on every use
+        "Cache-Control": "no-cache",
+        # The body is compressed per Accept-Encoding; a 304 must say so too
+        "Vary": "Accept-Encoding",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+    else:
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                since = None
+            if since is not None and since.tzinfo is not None and last_modified <= since:
+                return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return None
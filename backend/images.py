@@ -0,0 +1,191 @@
+"""
+Responsive image variants for uploaded pictures.
+
+Every upload gets resized copies (thumbnail, card, full) encoded as WebP
+with a JPEG fallback. Encoding is CPU-bound, so it runs in a process pool
+off the event loop; the upload request only stores the original and
+schedules the work. Variants live in the blob store under keys derived
+from the original's hash, so their URLs are known before they exist:
+
+    /api/images/{hash}/{variant}.{format}
+
+Until a variant has been generated that URL serves the original image,
+and so does it for good if the original can't be rendered.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Set
+
+from storage import BlobStore, IMAGE_URL_PREFIX, is_valid_key
+
+logger = logging.getLogger(__name__)
+
+# Originals whose variants couldn't be rendered, remembered so they aren't
+# retried on every request (least recently failed forgotten first)
+MAX_FAILED_RENDERS = 1024
+
+# Longest side in pixels; images are never upscaled
+VARIANTS = {
+    "thumbnail": 320,
+    "card": 640,
+    "full": 1600,
+}
+
+FORMATS = {
+    "webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+# Raster formats accepted as uploads, keyed by what Pillow detects in the
+# bytes; never trust the client's Content-Type (SVG and HTML run scripts)
+UPLOAD_FORMATS = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "WEBP": "image/webp",
+    "GIF": "image/gif",
+}
+IMAGE_CONTENT_TYPES = frozenset(UPLOAD_FORMATS.values())
+
+
+def sniff_image_type(data: bytes) -> Optional[str]:
+    """Content type of an accepted raster image, read from its header; None for anything else."""
+    from PIL import Image
+
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            return UPLOAD_FORMATS.get(image.format)
+    except (OSError, ValueError, Image.DecompressionBombError):
+        # UnidentifiedImageError is an OSError
+        return None
+
+
+def variant_key(original_key: str, variant: str, fmt: str) -> str:
+    return hashlib.sha256(f"{original_key}/{variant}.{fmt}".encode()).hexdigest()
+
+
+def variant_urls(image_url: Optional[str]) -> Dict[str, Dict[str, str]]:
+    """Map variant -> format -> URL for a blob-store image; empty for external URLs."""
+    if not image_url or not image_url.startswith(IMAGE_URL_PREFIX):
+        return {}
+    key = image_url[len(IMAGE_URL_PREFIX):]
+    if not is_valid_key(key):
+        return {}
+    return {
+        variant: {fmt: f"{image_url}/{variant}.{fmt}" for fmt in FORMATS}
+        for variant in VARIANTS
+    }
+
+
+def render_variants(data: bytes) -> Dict[str, bytes]:
+    """Resize and encode every variant. Runs inside a worker process."""
+    from PIL import Image, ImageOps
+
+    with Image.open(io.BytesIO(data)) as source:
+        source = ImageOps.exif_transpose(source)
+        if source.mode in ("RGBA", "LA", "P"):
+            rgba = source.convert("RGBA")
+            opaque = Image.new("RGB", rgba.size, (255, 255, 255))
+            opaque.paste(rgba, mask=rgba.split()[-1])
+        else:
+            rgba = None
+            opaque = source.convert("RGB")
+
+        output = {}
+        for variant, size in VARIANTS.items():
+            for fmt, (pil_format, _, options) in FORMATS.items():
+                # WebP keeps transparency; JPEG gets flattened on white
+                image = rgba if (rgba is not None and fmt == "webp") else opaque
+                resized = image.copy()
+                resized.thumbnail((size, size), Image.LANCZOS)
+                buffer = io.BytesIO()
+                resized.save(buffer, pil_format, **options)
+                output[f"{variant}.{fmt}"] = buffer.getvalue()
+        return output
+
+
+class ImagePipeline:
+    """Schedules variant generation on a bounded process pool."""
+
+    def __init__(self, store: BlobStore, max_workers: int = 2):
+        self.store = store
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._failed: "OrderedDict[str, None]" = OrderedDict()
+
+    def start(self):
+        if self._executor is None:
+            # Not fork: the server has threads (Motor, the profiler, the
+            # password hasher) whose locks a forked worker could inherit held
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+
+    def failed(self, key: str) -> bool:
+        """Whether rendering the variants of this original has already failed."""
+        return key in self._failed
+
+    async def drain(self):
+        """Wait for the variants scheduled so far."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def shutdown(self):
+        await self.drain()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def schedule(self, key: str, data: Optional[bytes] = None):
+        """Generate variants for a stored original in the background."""
+        if key in self._in_flight or key in self._failed:
+            return
+        self._in_flight.add(key)
+        task = asyncio.create_task(self._process(key, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _process(self, key: str, data: Optional[bytes]):
+        try:
+            # Variants are stored in order, so if the last one exists they all
+            # do (an image uploaded again): don't render them for nothing
+            last_variant, last_format = list(VARIANTS)[-1], list(FORMATS)[-1]
+            if await self.store.exists(variant_key(key, last_variant, last_format)):
+                return
+            if data is None:
+                data = b"".join([chunk async for chunk in self.store.iter_chunks(key)])
+            self.start()
+            loop = asyncio.get_running_loop()
+            try:
+                rendered = await loop.run_in_executor(self._executor, render_variants, data)
+            except BrokenProcessPool:
+                # A worker died (most likely on this image): start a fresh pool next time
+                self._executor.shutdown(wait=False)
+                self._executor = None
+                self._remember_failure(key)
+                raise
+            except Exception:
+                # Undecodable: the bytes behind a hash never change, so neither will this
+                self._remember_failure(key)
+                raise
+            for name, payload in rendered.items():
+                variant, fmt = name.split(".")
+                await self.store.put(payload, FORMATS[fmt][1], key=variant_key(key, variant, fmt))
+        except Exception as e:
+            logger.warning(f"Could not generate variants for image {key}: {str(e)}")
+        finally:
+            self._in_flight.discard(key)
+
+    def _remember_failure(self, key: str):
+        self._failed[key] = None
+        self._failed.move_to_end(key)
+        while len(self._failed) > MAX_FAILED_RENDERS:
+            self._failed.popitem(last=False)
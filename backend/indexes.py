@@ -0,0 +1,141 @@
+"""
+MongoDB index declarations for Paula Veiga Doces API
+
+Every lookup in the API filters on application-level fields (id, email,
+category_id...), so each collection declares the indexes it needs here.
+ensure_indexes() is called on startup: it creates what is missing and
+reports drift (indexes whose definition changed, or that exist in the
+database without being declared) without dropping anything by itself.
+"""
+import logging
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Options that make two indexes with the same keys behave differently
+_COMPARED_OPTIONS = ("unique", "sparse", "partialFilterExpression", "expireAfterSeconds", "default_language")
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "admins": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "categories": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_id"),
+    ],
+    "cakes": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Keyset pagination order
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_id"),
+        # Gallery filters: by category, optionally featured, newest first
+        IndexModel(
+            [("category_id", ASCENDING), ("featured", ASCENDING), ("created_at", DESCENDING)],
+            name="category_featured_created",
+        ),
+        # Price sorting, across the catalogue and within a category
+        IndexModel([("price", ASCENDING), ("id", ASCENDING)], name="price_id"),
+        IndexModel([("category_id", ASCENDING), ("price", ASCENDING), ("id", ASCENDING)], name="category_price_id"),
+        # Home page: featured cakes regardless of category
+        IndexModel([("featured", ASCENDING), ("created_at", DESCENDING)], name="featured_created"),
+        # Catalogue search (accents ignored, Portuguese stemming); name matches rank higher
+        IndexModel(
+            [("name", TEXT), ("description", TEXT)],
+            name="name_description_text",
+            weights={"name": 10, "description": 1},
+            default_language="portuguese",
+        ),
+        # Instagram imports are deduplicated by permalink; manual cakes have none
+        IndexModel(
+            [("instagram_url", ASCENDING)],
+            name="instagram_url_unique",
+            unique=True,
+            partialFilterExpression={"instagram_url": {"$type": "string"}},
+        ),
+    ],
+    "testimonials": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_id"),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Workers claim the oldest pending job
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created"),
+        # At most one active exclusive job per kind (see JobRunner.enqueue)
+        IndexModel(
+            [("active_kind", ASCENDING)],
+            name="active_kind_unique",
+            unique=True,
+            partialFilterExpression={"active_kind": {"$type": "string"}},
+        ),
+    ],
+    "settings": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+}
+
+
+def _normalize(spec: dict) -> dict:
+    keys = list(spec["key"].items()) if isinstance(spec["key"], dict) else [tuple(k) for k in spec["key"]]
+    if any(direction == TEXT for _, direction in keys):
+        # The server reports text indexes as _fts/_ftsx keys with the fields in
+        # weights; compare the fields and their weights instead
+        weights = {field: 1 for field, direction in keys if direction == TEXT and not field.startswith("_fts")}
+        weights.update(spec.get("weights") or {})
+        normalized = {"text": sorted(weights.items())}
+    else:
+        normalized = {"key": keys}
+    for option in _COMPARED_OPTIONS:
+        if spec.get(option) not in (None, False):
+            normalized[option] = spec[option]
+    return normalized
+
+
+async def ensure_indexes(db, dry_run: bool = False) -> Dict[str, Dict[str, list]]:
+    """Create missing indexes and report drift, per collection.
+
+    Returns {collection: {"created": [...], "drift": [...], "errors": [...]}}.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = await collection.index_information()
+        result = {"created": [], "drift": [], "errors": []}
+
+        for model in models:
+            declared = model.document
+            name = declared["name"]
+            if name in existing:
+                if _normalize(existing[name]) != _normalize(declared):
+                    result["drift"].append(f"{name}: definition differs from declaration")
+                continue
+            if dry_run:
+                result["created"].append(name)
+                continue
+            try:
+                await collection.create_indexes([model])
+                result["created"].append(name)
+            except OperationFailure as e:
+                # Typically duplicate values blocking a unique index
+                result["errors"].append(f"{name}: {e.details.get('errmsg', str(e)) if e.details else str(e)}")
+
+        declared_names = {model.document["name"] for model in models}
+        for name in existing:
+            if name != "_id_" and name not in declared_names:
+                result["drift"].append(f"{name}: not declared")
+
+        report[collection_name] = result
+    return report
+
+
+def log_report(report: Dict[str, Dict[str, list]]):
+    for collection_name, result in report.items():
+        if result["created"]:
+            logger.info(f"Indexes created on {collection_name}: {', '.join(result['created'])}")
+        for message in result["drift"]:
+            logger.warning(f"Index drift on {collection_name}: {message}")
+        for message in result["errors"]:
+            logger.error(f"Could not create index on {collection_name}: {message}")
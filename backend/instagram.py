@@ -0,0 +1,212 @@
+"""
+Instagram Graph API client and media import.
+
+Uses a pooled httpx.AsyncClient so syncing never blocks the event loop,
+retries transient failures (timeouts, 429, 5xx) with exponential
+backoff, and follows paging.next cursors to walk the whole media
+history. The base URL is configurable so tests can point it at a local
+stub server.
+"""
+import asyncio
+import logging
+import random
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional
+
+import httpx
+from pymongo.errors import BulkWriteError
+
+from documents import utcnow
+
+logger = logging.getLogger(__name__)
+
+GRAPH_URL = "https://graph.instagram.com"
+MEDIA_FIELDS = "id,caption,media_type,media_url,thumbnail_url,permalink,timestamp"
+IMPORTABLE_TYPES = ("IMAGE", "CAROUSEL_ALBUM")
+
+_RETRY_STATUS = {429, 500, 502, 503, 504}
+
+# Most posts resolved against the database per $in query / insert_many;
+# the batch is also flushed after every fetched page
+IMPORT_BATCH_SIZE = 500
+_DUPLICATE_KEY = 11000
+
+
+class InstagramError(Exception):
+    """The Graph API rejected the request (bad token, permissions...)."""
+
+
+class InstagramUnavailable(Exception):
+    """The Graph API could not be reached after retrying."""
+
+
+class InstagramClient:
+    def __init__(self, base_url: str = GRAPH_URL, timeout: float = 10.0, max_retries: int = 3,
+                 backoff: float = 0.5, page_size: int = 50, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.page_size = page_size
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=10, max_keepalive_connections=5),
+                transport=self._transport,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _get(self, url: str, params: Optional[dict] = None) -> dict:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.client.get(url, params=params)
+            except httpx.TransportError as e:
+                if attempt == self.max_retries:
+                    raise InstagramUnavailable(str(e))
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in _RETRY_STATUS or attempt == self.max_retries:
+                    try:
+                        message = response.json().get("error", {}).get("message")
+                    except ValueError:
+                        message = None
+                    raise InstagramError(message or "Token inválido ou expirado")
+            # Exponential backoff with jitter: 0.5s, 1s, 2s...
+            await asyncio.sleep(self.backoff * (2 ** attempt) * (0.5 + random.random()))
+        raise InstagramUnavailable("retries exhausted")
+
+    async def iter_pages(self, user_id: str, access_token: str) -> AsyncIterator[List[dict]]:
+        """Yield the account's media one API page at a time, newest first."""
+        url = f"{self.base_url}/{user_id}/media"
+        params = {"fields": MEDIA_FIELDS, "access_token": access_token, "limit": self.page_size}
+        while url:
+            data = await self._get(url, params)
+            yield data.get("data", [])
+            # paging.next is a complete URL that already carries the cursor and token
+            url = (data.get("paging") or {}).get("next")
+            params = None
+
+    async def iter_media(self, user_id: str, access_token: str) -> AsyncIterator[dict]:
+        """Yield every media item of the account, newest first, across all pages."""
+        async for page in self.iter_pages(user_id, access_token):
+            for item in page:
+                yield item
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Parse Graph API timestamps such as 2024-05-01T18:10:00+0000."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+    except ValueError:
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            return None
+
+
+def media_to_cake(item: dict, category_id: str) -> Optional[dict]:
+    """Build a cake document from a Graph API media item, or None if it can't be imported."""
+    if item.get("media_type") not in IMPORTABLE_TYPES or not item.get("permalink"):
+        return None
+    image_url = item.get("media_url") or item.get("thumbnail_url")
+    if not image_url:
+        return None
+    caption = item.get("caption")
+    return {
+        "id": str(uuid.uuid4()),
+        "name": (caption or "Criação Paula Veiga")[:50],
+        "description": caption or "Mais uma delícia da Paula Veiga!",
+        "price": 0,
+        "category_id": category_id,
+        "image_url": image_url,
+        "instagram_url": item["permalink"],
+        "featured": False,
+        "created_at": utcnow()
+    }
+
+
+async def _insert_new(db, cakes: List[dict]) -> int:
+    """Insert the cakes whose permalink isn't in the database yet. Returns how many were inserted."""
+    if not cakes:
+        return 0
+    permalinks = [cake["instagram_url"] for cake in cakes]
+    existing = {
+        doc["instagram_url"]
+        async for doc in db.cakes.find({"instagram_url": {"$in": permalinks}}, {"_id": 0, "instagram_url": 1})
+    }
+    new_cakes = [cake for cake in cakes if cake["instagram_url"] not in existing]
+    if not new_cakes:
+        return 0
+    try:
+        result = await db.cakes.insert_many(new_cakes, ordered=False)
+        return len(result.inserted_ids)
+    except BulkWriteError as e:
+        # A concurrent sync may have inserted some permalinks in the meantime;
+        # the unique instagram_url index rejects those and the rest still land
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != _DUPLICATE_KEY for error in errors):
+            raise
+        return e.details.get("nInserted", 0)
+
+
+async def import_media(db, client: InstagramClient, user_id: str, access_token: str,
+                       since: Optional[datetime] = None,
+                       on_progress: Optional[Callable[[dict], Awaitable[None]]] = None) -> dict:
+    """Import every not-yet-imported post as a cake. Returns counts.
+
+    With `since`, paging stops at the first post not newer than it (the
+    API lists newest first), so incremental syncs fetch only new media.
+    Each page is written before `on_progress` is called with the counts
+    so far.
+    """
+    default_category = await db.categories.find_one({}, {"_id": 0})
+    category_id = default_category["id"] if default_category else "cat-especial"
+
+    counts = {"fetched": 0, "imported": 0, "skipped": 0, "latest_timestamp": None}
+    batch = {}
+
+    async def flush():
+        inserted = await _insert_new(db, list(batch.values()))
+        counts["imported"] += inserted
+        counts["skipped"] += len(batch) - inserted
+        batch.clear()
+
+    latest = None
+    reached_known = False
+    async for page in client.iter_pages(user_id, access_token):
+        for item in page:
+            timestamp = parse_timestamp(item.get("timestamp"))
+            if since is not None and timestamp is not None and timestamp <= since:
+                reached_known = True
+                break
+            counts["fetched"] += 1
+            if timestamp is not None and (latest is None or timestamp > latest):
+                latest = timestamp
+                counts["latest_timestamp"] = latest
+            cake = media_to_cake(item, category_id)
+            if cake is None or cake["instagram_url"] in batch:
+                counts["skipped"] += 1
+                continue
+            batch[cake["instagram_url"]] = cake
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await flush()
+        await flush()
+        if on_progress is not None:
+            await on_progress(dict(counts))
+        if reached_known:
+            break
+    return counts
@@ -0,0 +1,251 @@
+"""
+Background jobs stored in the `jobs` collection.
+
+Long-running work (Instagram sync) is enqueued as a job document and
+executed by an in-process asyncio worker, so the HTTP request returns
+immediately and the admin polls GET /api/jobs/{id} for progress. Jobs are
+claimed with an atomic find_one_and_update, so several server processes
+can share the same queue without running a job twice. Exclusive jobs
+(one pending or running per kind) carry an `active_kind` field under a
+unique index, so processes enqueueing at the same moment cannot both
+succeed.
+
+A running job holds a lease: its runner refreshes `heartbeat_at` while
+the handler works. If the process dies mid-job the heartbeat stops, and
+any runner puts the job back to pending (or fails it after
+JOB_MAX_ATTEMPTS claims) once the lease has expired, releasing the
+exclusive lock.
+"""
+import asyncio
+import logging
+import uuid
+from datetime import timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from documents import utcnow
+
+logger = logging.getLogger(__name__)
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+# Claims before a job whose runner keeps disappearing is given up on
+JOB_MAX_ATTEMPTS = 3
+
+# handler(job, report_progress) -> result dict
+ProgressReporter = Callable[[dict], Awaitable[None]]
+JobHandler = Callable[[dict, ProgressReporter], Awaitable[dict]]
+
+
+class JobRunner:
+    def __init__(self, poll_interval: float = 5.0, lease: float = 120.0):
+        self.db = None
+        self.poll_interval = poll_interval
+        self.lease = lease
+        self.handlers: Dict[str, JobHandler] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    async def enqueue(self, kind: str, params: Optional[dict] = None, exclusive: bool = False) -> Optional[dict]:
+        """Insert a pending job. Exclusive jobs return None if one of that kind is already active."""
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "status": JOB_PENDING,
+            "params": params or {},
+            "progress": {},
+            "result": None,
+            "error": None,
+            "created_at": utcnow(),
+            "started_at": None,
+            "finished_at": None,
+            "attempts": 0,
+        }
+        if exclusive:
+            job["active_kind"] = kind
+        try:
+            await self.db.jobs.insert_one(dict(job))
+        except DuplicateKeyError:
+            if exclusive:
+                return None
+            raise
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job
+
+    async def get(self, job_id: str) -> Optional[dict]:
+        return await self.db.jobs.find_one({"id": job_id}, {"_id": 0})
+
+    async def find_active(self, kind: str) -> Optional[dict]:
+        """Return a pending or running job of this kind, if any."""
+        return await self.db.jobs.find_one(
+            {"kind": kind, "status": {"$in": [JOB_PENDING, JOB_RUNNING]}}, {"_id": 0}
+        )
+
+    def start(self, db):
+        self.db = db
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._work())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+    async def _claim(self) -> Optional[dict]:
+        now = utcnow()
+        job = await self.db.jobs.find_one_and_update(
+            {"status": JOB_PENDING, "kind": {"$in": list(self.handlers)}},
+            {"$set": {"status": JOB_RUNNING, "started_at": now, "heartbeat_at": now}, "$inc": {"attempts": 1}},
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        if job is not None:
+            job.pop("_id", None)
+        return job
+
+    async def recover_stale(self) -> int:
+        """Requeue (or fail) running jobs whose lease has expired. Returns how many."""
+        cutoff = utcnow() - timedelta(seconds=self.lease)
+        stale = {"status": JOB_RUNNING, "$or": [
+            {"heartbeat_at": {"$lt": cutoff}},
+            # Claimed before jobs had heartbeats
+            {"heartbeat_at": {"$exists": False}, "started_at": {"$lt": cutoff}},
+        ]}
+        failed = await self.db.jobs.update_many(
+            {**stale, "attempts": {"$gte": JOB_MAX_ATTEMPTS}},
+            {"$set": {"status": JOB_FAILED, "error": "Tarefa interrompida", "finished_at": utcnow()},
+             "$unset": {"active_kind": "", "heartbeat_at": ""}},
+        )
+        requeued = await self.db.jobs.update_many(
+            stale,
+            {"$set": {"status": JOB_PENDING, "started_at": None}, "$unset": {"heartbeat_at": ""}},
+        )
+        recovered = failed.modified_count + requeued.modified_count
+        if recovered:
+            logger.warning(f"Recovered {recovered} job(s) whose runner stopped responding")
+        return recovered
+
+    async def _work(self):
+        last_recovery = None
+        while True:
+            # On start, then about every lease/2 (every process does this;
+            # the updates are idempotent)
+            now = asyncio.get_running_loop().time()
+            if last_recovery is None or now - last_recovery >= self.lease / 2:
+                last_recovery = now
+                try:
+                    await self.recover_stale()
+                except Exception as e:
+                    logger.error(f"Could not recover stale jobs: {str(e)}")
+            try:
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Could not claim job: {str(e)}")
+                job = None
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one job end the worker; its lease expiring recovers it
+                logger.error(f"Job {job['id']} ({job['kind']}) could not be finished: {str(e)}")
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease / 4)
+            try:
+                await self.db.jobs.update_one(
+                    {"id": job_id, "status": JOB_RUNNING}, {"$set": {"heartbeat_at": utcnow()}}
+                )
+            except Exception as e:
+                logger.error(f"Could not renew lease of job {job_id}: {str(e)}")
+
+    async def _run(self, job: dict):
+        async def report_progress(progress: dict):
+            await self.db.jobs.update_one({"id": job["id"]}, {"$set": {"progress": progress}})
+
+        update = {}
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await self.handlers[job["kind"]](job, report_progress)
+            update.update(status=JOB_SUCCEEDED, result=result)
+        except asyncio.CancelledError:
+            # Shutting down mid-job: put it back so the next start picks it up
+            # (it stays the active job of its kind)
+            await self.db.jobs.update_one(
+                {"id": job["id"]},
+                {"$set": {"status": JOB_PENDING, "started_at": None}, "$unset": {"heartbeat_at": ""}},
+            )
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) failed: {str(e)}")
+            update.update(status=JOB_FAILED, error=str(e))
+        finally:
+            # Without heartbeats the lease expires, so whatever happens below
+            # the job cannot hold its exclusive lock for good
+            heartbeat.cancel()
+        update["finished_at"] = utcnow()
+        await self.db.jobs.update_one(
+            {"id": job["id"]}, {"$set": update, "$unset": {"active_kind": "", "heartbeat_at": ""}}
+        )
+
+
+class PeriodicScheduler:
+    """Enqueues a job every `interval` seconds unless one of that kind is already queued."""
+
+    def __init__(self, runner: JobRunner, kind: str, interval: float,
+                 params: Optional[dict] = None, enabled: Optional[Callable[[], Awaitable[bool]]] = None):
+        self.runner = runner
+        self.kind = kind
+        self.interval = interval
+        self.params = params or {}
+        self.enabled = enabled
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                if self.enabled is not None and not await self.enabled():
+                    continue
+                # Every server process runs a scheduler; only one enqueue wins
+                await self.runner.enqueue(self.kind, self.params, exclusive=True)
+            except Exception as e:
+                logger.error(f"Could not schedule {self.kind} job: {str(e)}")
@@ -0,0 +1,157 @@
+"""
+Maintenance commands for Paula Veiga Doces API
+Run from the backend directory: python manage.py --help
+"""
+import asyncio
+import os
+from typing import Optional
+
+import typer
+
+app = typer.Typer(help="Comandos de manutenção do backend")
+
+
+async def _migrate_images(dry_run: bool) -> dict:
+    from server import blob_store, connect
+
+    db = connect()
+    from images import sniff_image_type
+    from storage import parse_data_url, blob_url
+
+    stats = {"cakes": 0, "settings": 0, "skipped": 0}
+
+    async def to_blob(url):
+        parsed = parse_data_url(url)
+        if parsed is None:
+            stats["skipped"] += 1
+            return None
+        _, data = parsed
+        # Same rule as uploads: only raster images, typed by their bytes
+        content_type = sniff_image_type(data)
+        if content_type is None:
+            stats["skipped"] += 1
+            return None
+        if dry_run:
+            return url
+        blob = await blob_store.put(data, content_type)
+        return blob_url(blob.key)
+
+    cursor = db.cakes.find({"image_url": {"$regex": "^data:"}}, {"_id": 0, "id": 1, "image_url": 1})
+    async for cake in cursor:
+        new_url = await to_blob(cake["image_url"])
+        if new_url is None:
+            continue
+        if not dry_run:
+            await db.cakes.update_one({"id": cake["id"]}, {"$set": {"image_url": new_url}})
+        stats["cakes"] += 1
+
+    settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
+    if settings:
+        update = {}
+        for field in ("hero_image_url", "logo_url"):
+            if (settings.get(field) or "").startswith("data:"):
+                new_url = await to_blob(settings[field])
+                if new_url is not None:
+                    update[field] = new_url
+        if update and not dry_run:
+            await db.settings.update_one({"id": "site_settings"}, {"$set": update})
+        stats["settings"] += len(update)
+
+    return stats
+
+
+@app.command("migrate-images")
+def migrate_images(dry_run: bool = typer.Option(False, "--dry-run", help="Só conta, não grava")):
+    """Move data: URLs from cakes and settings into the blob store."""
+    stats = asyncio.run(_migrate_images(dry_run))
+    typer.echo(
+        f"Bolos: {stats['cakes']} | Configurações: {stats['settings']} | "
+        f"Ignorados (data URL inválida): {stats['skipped']}"
+    )
+
+
+@app.command("indexes")
+def sync_indexes(check: bool = typer.Option(False, "--check", help="Só relata, não cria índices")):
+    """Create missing MongoDB indexes and report drift."""
+    from server import connect
+    from indexes import ensure_indexes
+
+    async def run():
+        return await ensure_indexes(connect(), dry_run=check)
+
+    report = asyncio.run(run())
+    for collection_name, result in report.items():
+        label = "faltando" if check else "criados"
+        typer.echo(f"{collection_name}: {label}={result['created'] or '-'}")
+        for message in result["drift"] + result["errors"]:
+            typer.echo(f"  ! {message}")
+
+
+@app.command("migrate-dates")
+def migrate_dates(dry_run: bool = typer.Option(False, "--dry-run", help="Só conta, não grava")):
+    """Convert ISO-string date fields into native BSON dates."""
+    from server import connect
+    from documents import migrate_dates as run_migration
+
+    async def run():
+        return await run_migration(connect(), dry_run=dry_run)
+
+    converted = asyncio.run(run())
+    for collection_name, count in converted.items():
+        typer.echo(f"{collection_name}: {count} documentos convertidos")
+
+
+# Default worker cap: each worker adds a MongoDB pool and its own caches
+MAX_DEFAULT_WORKERS = 4
+
+
+def _cgroup_cpu_limit() -> Optional[float]:
+    """CPUs allowed by the container's CFS quota (cgroup v2 or v1), None if unlimited."""
+    try:
+        quota, period = open("/sys/fs/cgroup/cpu.max").read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        quota = int(open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us").read())
+        period = int(open("/sys/fs/cgroup/cpu/cpu.cfs_period_us").read())
+        return quota / period if quota > 0 and period > 0 else None
+    except (OSError, ValueError):
+        return None
+
+
+def _cpu_count() -> int:
+    # CPUs this process may run on (respects container CPU sets)...
+    try:
+        count = len(os.sched_getaffinity(0))
+    except AttributeError:
+        count = os.cpu_count() or 1
+    # ...and how much of them the container may use
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        count = min(count, max(1, int(limit)))
+    return count
+
+
+@app.command("serve")
+def serve(
+    host: str = typer.Option("0.0.0.0", help="Endereço de escuta"),
+    port: int = typer.Option(8000, envvar="PORT", help="Porta (ou $PORT)"),
+    workers: Optional[int] = typer.Option(None, help=f"Processos (padrão: WEB_CONCURRENCY ou nº de CPUs, até {MAX_DEFAULT_WORKERS})"),
+):
+    """Run the API with uvicorn, one process per worker."""
+    import uvicorn
+    from config import settings
+
+    workers = workers or settings.WEB_CONCURRENCY or min(_cpu_count(), MAX_DEFAULT_WORKERS)
+    typer.echo(f"Iniciando {workers} worker(s) em {host}:{port}")
+    # Workers share nothing but MongoDB: each has its own connection pool
+    # (MONGO_MAX_POOL_SIZE), response cache and background job runner, and
+    # they tell each other about writes through it (CACHE_SYNC_INTERVAL)
+    uvicorn.run("server:app", host=host, port=port, workers=workers)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,196 @@
+"""
+Request and MongoDB metrics in the Prometheus text format.
+
+MetricsMiddleware records request counts by status, a latency histogram
+and request/response size histograms per route template (/api/cakes/{cake_id},
+not one series per id). MongoCommandListener is a pymongo CommandListener
+timing every command per collection. Motor runs pymongo in worker threads,
+so the metrics are guarded by locks. GET /api/metrics renders them all.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from pymongo import monitoring
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# Requests no route matched (404s, probes): one series, whatever the path
+UNMATCHED_ROUTE = "unmatched"
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(labels.items())
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(labels)} {_format_number(value)}" for labels, value in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float]):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(buckets)
+        # Per label set: a count per bucket (not cumulative), then sum and count
+        self._series: Dict[Labels, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(labels.items())
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * len(self.buckets) + [0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, list(values)) for labels, values in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, values in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', str(bound)),))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_number(values[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {values[-1]}")
+        return lines
+
+
+class Metrics:
+    def __init__(self):
+        self.requests = Counter("http_requests_total", "HTTP requests by route and status.")
+        self.request_duration = Histogram(
+            "http_request_duration_seconds", "Time to send the full response.", LATENCY_BUCKETS)
+        self.request_size = Histogram("http_request_size_bytes", "Request body size.", SIZE_BUCKETS)
+        self.response_size = Histogram(
+            "http_response_size_bytes", "Response body size as sent (after compression).", SIZE_BUCKETS)
+        self.mongo_duration = Histogram(
+            "mongodb_command_duration_seconds", "MongoDB command round trips by collection.", MONGO_BUCKETS)
+        self.mongo_failures = Counter("mongodb_command_failures_total", "Failed MongoDB commands by collection.")
+
+    def render(self) -> str:
+        families = (
+            self.requests, self.request_duration, self.request_size, self.response_size,
+            self.mongo_duration, self.mongo_failures,
+        )
+        return "\n".join(line for family in families for line in family.render()) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI, outermost, so timings and sizes cover compression too."""
+
+    def __init__(self, app: ASGIApp, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+        self._paths: Dict[Callable, str] = {}
+
+    def _route(self, scope: Scope) -> str:
+        # The router records the matched endpoint in the (shared) scope
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return UNMATCHED_ROUTE
+        path = self._paths.get(endpoint)
+        if path is None:
+            self._paths = {
+                route.endpoint: route.path for route in scope["app"].routes if hasattr(route, "endpoint")
+            }
+            path = self._paths.get(endpoint, UNMATCHED_ROUTE)
+        return path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status, sent = 500, 0
+
+        async def send_with_metrics(message: Message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            labels = {"method": scope["method"], "route": self._route(scope)}
+            self.metrics.requests.inc(**labels, status=str(status))
+            self.metrics.request_duration.observe(time.perf_counter() - started, **labels)
+            self.metrics.response_size.observe(sent, **labels)
+            content_length = Headers(scope=scope).get("content-length")
+            if content_length and content_length.isdigit():
+                self.metrics.request_size.observe(int(content_length), **labels)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self, metrics: Metrics):
+        self.metrics = metrics
+        # The collection is only on the started event
+        self._collections: Dict[Tuple, str] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(event) -> Tuple:
+        return (event.connection_id, event.request_id)
+
+    def started(self, event: monitoring.CommandStartedEvent):
+        target = event.command.get("collection" if event.command_name == "getMore" else event.command_name)
+        # Database-level commands (ping, endSessions...) carry 1 rather than a name
+        collection = target if isinstance(target, str) else ""
+        with self._lock:
+            self._collections[self._key(event)] = collection
+
+    def _observe(self, event) -> Dict[str, str]:
+        with self._lock:
+            collection = self._collections.pop(self._key(event), "")
+        labels = {"collection": collection, "command": event.command_name}
+        self.metrics.mongo_duration.observe(event.duration_micros / 1_000_000, **labels)
+        return labels
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent):
+        self._observe(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent):
+        self.metrics.mongo_failures.inc(**self._observe(event))
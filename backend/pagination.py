@@ -0,0 +1,99 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Pages are ordered by (created_at, id) by default, or by another field
+with id as tie-breaker, and the cursor is an opaque token holding the
+last item's sort key, so fetching page N costs the same as page 1 and
+concurrent inserts never shift items between pages.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Generic, List, Optional, Tuple, TypeVar
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, DESCENDING
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_token(payload: dict) -> str:
+    """Opaque, URL-safe cursor holding payload."""
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_token(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as e:
+        raise InvalidCursor(str(e))
+    if not isinstance(payload, dict):
+        raise InvalidCursor("cursor payload is not an object")
+    return payload
+
+
+def encode_cursor(doc: dict, field: str = "created_at") -> str:
+    value = doc.get(field)
+    is_datetime = isinstance(value, datetime)
+    payload = {
+        "c": value.isoformat() if is_datetime else value,
+        "d": is_datetime,
+        "i": doc.get("id"),
+    }
+    if field != "created_at":
+        payload["f"] = field
+    return encode_token(payload)
+
+
+def decode_cursor(cursor: str, field: str = "created_at") -> Tuple[object, str]:
+    payload = decode_token(cursor)
+    # A cursor only makes sense for the ordering that produced it
+    if payload.get("f", "created_at") != field:
+        raise InvalidCursor("cursor was issued for another sort order")
+    try:
+        value = payload["c"]
+        if payload.get("d"):
+            value = datetime.fromisoformat(value)
+        return value, payload["i"]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+async def paginate(collection, query: dict, limit: int, cursor: Optional[str] = None,
+                   projection: Optional[dict] = None, descending: bool = True,
+                   sort_field: str = "created_at"):
+    """Return (items, next_cursor) for one page of collection matching query."""
+    direction = DESCENDING if descending else ASCENDING
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_field)
+        op = "$lt" if descending else "$gt"
+        after = {"$or": [
+            {sort_field: {op: value}},
+            {sort_field: value, "id": {op: last_id}},
+        ]}
+        query = {"$and": [query, after]} if query else after
+
+    projection = projection or {"_id": 0}
+    docs = await collection.find(query, projection) \
+        .sort([(sort_field, direction), ("id", direction)]) \
+        .limit(limit + 1) \
+        .to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_cursor(docs[-1], sort_field)
+    return docs, next_cursor
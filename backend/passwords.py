@@ -0,0 +1,69 @@
+"""
+Async bcrypt password hashing.
+
+bcrypt is deliberately slow (~200ms at cost 12), so calling it inside an
+async handler stalls every other request on the worker. PasswordHasher
+runs it on a small dedicated thread pool (bcrypt releases the GIL) and
+caps how many hashes can be queued, so a burst of logins degrades into
+fast 503s instead of an unresponsive server.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many hash operations are already waiting."""
+
+
+class PasswordHasher:
+    def __init__(self, rounds: int = 12, max_workers: int = 4, max_pending: int = 64):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+    async def _run(self, func, *args):
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusy()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        self._pending += 1
+        try:
+            async with self._semaphore:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        hashed = await self._run(self._hash_sync, password.encode('utf-8'), self.rounds)
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True when hashed was produced with a lower cost than configured."""
+        # Modular crypt format: $2b$<cost>$<salt+hash>
+        try:
+            cost = int(hashed.split('$')[2])
+        except (IndexError, ValueError):
+            return True
+        return cost < self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        self._semaphore = None
+
+    @staticmethod
+    def _hash_sync(password: bytes, rounds: int) -> bytes:
+        return bcrypt.hashpw(password, bcrypt.gensalt(rounds=rounds))
@@ -0,0 +1,203 @@
+"""
+Opt-in sampling profiler for slow requests.
+
+ProfilerMiddleware watches a fraction of requests (PROFILE_SAMPLE_RATE),
+or every request when PROFILE_SLOW_MS is set, since a request is only
+known to be slow once it has finished. While they run, a background
+thread samples each watched request every PROFILE_INTERVAL_MS:
+
+- if the request's task is the one on the event loop, it takes the loop
+  thread's real stack (pydantic validation, date parsing, ...);
+- otherwise it takes the task's await chain, ending in a "<waiting ...>"
+  frame, so time spent waiting on MongoDB shows up too.
+
+A watched request is kept when it was sampled, or when it took longer
+than the threshold. The last PROFILE_KEEP profiles are kept in memory
+and served in collapsed-stack format ("frame;frame;frame count"), which
+flamegraph.pl and speedscope read directly.
+
+Work in child tasks (asyncio.gather) is not attributed to the request;
+the request itself shows as waiting on the gather.
+"""
+import asyncio
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import FrameType
+from typing import Deque, Dict, List, Optional
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from documents import utcnow
+
+
+@dataclass
+class Profile:
+    method: str
+    path: str
+    started_at: datetime
+    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    status: int = 500
+    duration_ms: float = 0.0
+    reason: str = "sampled"
+    stacks: Counter = field(default_factory=Counter)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": self.duration_ms,
+            "reason": self.reason,
+            "samples": self.samples,
+            "started_at": self.started_at,
+        }
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+@dataclass
+class _Watch:
+    profile: Profile
+    task: asyncio.Task
+    # The middleware's frame: stacks are recorded from here down
+    root: FrameType
+
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+
+
+def _running_stack(leaf: FrameType, root: FrameType) -> List[str]:
+    """The loop thread's stack from root down, or [] if root is not on it."""
+    frames = []
+    frame: Optional[FrameType] = leaf
+    while frame is not None:
+        frames.append(_label(frame))
+        if frame is root:
+            frames.reverse()
+            return frames
+        frame = frame.f_back
+    return []
+
+
+def _awaiting_stack(task: asyncio.Task, root: FrameType) -> List[str]:
+    frames: List[str] = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            if not hasattr(awaitable, "cr_await") and not hasattr(awaitable, "gi_yieldfrom"):
+                # A future (seen through its C iterator), or another awaitable
+                name = type(awaitable).__name__
+                frames.append(f"<waiting {'Future' if name == 'FutureIter' else name}>")
+            break
+        if frame is root:
+            frames.clear()
+        frames.append(_label(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    return frames
+
+
+class Profiler:
+    def __init__(self, sample_rate: float, slow_ms: float, interval_ms: float, keep: int):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval = interval_ms / 1000
+        self.profiles: Deque[Profile] = deque(maxlen=keep)
+        self._watches: Dict[str, _Watch] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def get(self, profile_id: str) -> Optional[Profile]:
+        return next((profile for profile in self.profiles if profile.id == profile_id), None)
+
+    def watch(self, profile: Profile, root: FrameType):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+        with self._lock:
+            self._watches[profile.id] = _Watch(profile, asyncio.current_task(), root)
+        self._wake.set()
+
+    def finish(self, profile: Profile, sampled: bool):
+        with self._lock:
+            self._watches.pop(profile.id, None)
+            if not self._watches:
+                self._wake.clear()
+        if sampled:
+            self.profiles.append(profile)
+        elif self.slow_ms > 0 and profile.duration_ms >= self.slow_ms:
+            profile.reason = "slow"
+            self.profiles.append(profile)
+
+    def _run(self):
+        while True:
+            self._wake.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                watches = list(self._watches.values())
+            if not watches:
+                continue
+            running = asyncio.current_task(self._loop)
+            leaf = sys._current_frames().get(self._loop_thread)
+            samples = []
+            for watch in watches:
+                stack = []
+                if watch.task is running and leaf is not None:
+                    stack = _running_stack(leaf, watch.root)
+                # Suspended, or switched out between the two reads above
+                if not stack:
+                    stack = _awaiting_stack(watch.task, watch.root)
+                if stack:
+                    samples.append((watch.profile, ";".join(stack)))
+            del leaf
+            with self._lock:
+                # Finished profiles are being served: leave them alone
+                for profile, stack in samples:
+                    if profile.id in self._watches:
+                        profile.stacks[stack] += 1
+
+
+class ProfilerMiddleware:
+    def __init__(self, app: ASGIApp, profiler: Profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        sampled = random.random() < self.profiler.sample_rate
+        if scope["type"] != "http" or not (sampled or self.profiler.slow_ms > 0):
+            await self.app(scope, receive, send)
+            return
+        profile = Profile(method=scope["method"], path=scope["path"], started_at=utcnow())
+
+        async def send_with_status(message: Message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        self.profiler.watch(profile, sys._getframe())
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            profile.duration_ms = round((time.perf_counter() - started) * 1000, 2)
+            self.profiler.finish(profile, sampled)
@@ -0,0 +1,54 @@
+"""
+Full-text search over cakes.
+
+Backed by the name_description_text index: Portuguese stemming, and
+text indexes ignore accents, so "aniversario" finds "Aniversário".
+Results are ranked by textScore (name matches weigh more than the
+description) and paged with an opaque cursor holding the last
+(score, id), like the keyset pagination of the list endpoints.
+"""
+from typing import List, Optional, Tuple
+
+from pagination import InvalidCursor, decode_token, encode_token
+
+MAX_QUERY_LENGTH = 100
+
+
+def _decode(cursor: str) -> Tuple[float, str]:
+    payload = decode_token(cursor)
+    score, last_id = payload.get("s"), payload.get("i")
+    if not isinstance(score, (int, float)) or not isinstance(last_id, str):
+        raise InvalidCursor("malformed search cursor")
+    return float(score), last_id
+
+
+async def search(collection, q: str, limit: int, cursor: Optional[str] = None,
+                 projection: Optional[dict] = None, query: Optional[dict] = None) -> Tuple[List[dict], Optional[str]]:
+    """Return (items, next_cursor) for one page of documents matching q, best match first."""
+    match = {"$text": {"$search": q}}
+    if query:
+        match.update(query)
+    pipeline = [
+        {"$match": match},
+        {"$addFields": {"_score": {"$meta": "textScore"}}},
+    ]
+    if cursor:
+        score, last_id = _decode(cursor)
+        pipeline.append({"$match": {"$or": [
+            {"_score": {"$lt": score}},
+            {"_score": score, "id": {"$gt": last_id}},
+        ]}})
+    pipeline += [
+        {"$sort": {"_score": -1, "id": 1}},
+        {"$limit": limit + 1},
+        {"$project": {**(projection or {"_id": 0}), "_score": 1}},
+    ]
+    docs = await collection.aggregate(pipeline).to_list(limit + 1)
+
+    next_cursor = None
+    if len(docs) > limit:
+        docs = docs[:limit]
+        next_cursor = encode_token({"s": docs[-1]["_score"], "i": docs[-1]["id"]})
+    for doc in docs:
+        doc.pop("_score", None)
+    return docs, next_cursor
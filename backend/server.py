@@ -1,39 +1,130 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.routing import serialize_response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import DeleteOne, InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
 import os
+import asyncio
 import logging
-from pathlib import Path
-from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+import time
+from pydantic import BaseModel, Field, ConfigDict, ValidationError, computed_field
+from typing import Dict, List, Literal, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 import jwt
-import bcrypt
-import base64
-
-ROOT_DIR = Path(__file__).parent
-load_dotenv(ROOT_DIR / '.env')
-
-# MongoDB connection
-try:
-    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-    db_name = os.environ.get('DB_NAME', 'paula_veiga_doces')
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[db_name]
-    logger = logging.getLogger(__name__)
-    logger.info(f"MongoDB connection initialized with database: {db_name}")
-except Exception as e:
-    logger = logging.getLogger(__name__)
-    logger.error(f"Error initializing MongoDB: {str(e)}")
+
+from config import settings as app_settings
+from storage import create_blob_store, blob_url, is_valid_key, BlobNotFound
+from images import ImagePipeline, FORMATS, IMAGE_CONTENT_TYPES, VARIANTS, sniff_image_type, variant_key, variant_urls
+from indexes import ensure_indexes, log_report
+from pagination import Page, paginate, InvalidCursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from passwords import PasswordHasher, PasswordHasherBusy
+from instagram import InstagramClient, InstagramError, InstagramUnavailable, import_media
+from jobs import JobRunner, PeriodicScheduler
+from cache import ResponseCache, SharedInvalidations
+from etags import CollectionVersions, conditional_get
+from stats import compute_stats
+from search import MAX_QUERY_LENGTH, search
+from documents import apply_defaults, to_document, projection_for, utcnow
+from serialization import dumps
+from compression import CompressionMiddleware, PrecompressedBody
+from database import PoolStats, create_client, default_database
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, Metrics, MetricsMiddleware, MongoCommandListener
+from profiling import Profiler, ProfilerMiddleware
+
+# Request and MongoDB command metrics, served at /api/metrics
+metrics = Metrics()
+
+# Sampled request profiles, served at /api/profiles
+profiler = Profiler(
+    sample_rate=app_settings.PROFILE_SAMPLE_RATE,
+    slow_ms=app_settings.PROFILE_SLOW_MS,
+    interval_ms=app_settings.PROFILE_INTERVAL_MS,
+    keep=app_settings.PROFILE_KEEP,
+) if app_settings.PROFILING_ENABLED else None
+
+logger = logging.getLogger(__name__)
+
+# MongoDB: created on startup by connect(), not at import, so every worker
+# builds its own pool from Settings on the loop that uses it
+client: Optional[AsyncIOMotorClient] = None
+db: Optional[AsyncIOMotorDatabase] = None
+pool_stats = PoolStats()
+
+def connect(db_name: Optional[str] = None) -> AsyncIOMotorDatabase:
+    """Create the Motor client from settings and return the database.
+
+    Called on startup; manage.py and the benchmarks call it themselves.
+    """
+    global client, db
+    event_listeners = [pool_stats]
+    if app_settings.METRICS_ENABLED:
+        event_listeners.append(MongoCommandListener(metrics))
+    client = create_client(app_settings, event_listeners)
+    db = client[db_name] if db_name else default_database(client, app_settings)
+    logger.info(f"MongoDB client created for database: {db.name}")
+    return db
 
 # JWT Settings
 JWT_SECRET = os.environ.get('JWT_SECRET', 'paula-veiga-secret-key-2024')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# Image storage
+blob_store = create_blob_store(app_settings)
+image_pipeline = ImagePipeline(blob_store, max_workers=app_settings.IMAGE_WORKERS)
+
+# Password hashing (bcrypt runs off the event loop)
+password_hasher = PasswordHasher(
+    rounds=app_settings.BCRYPT_ROUNDS,
+    max_workers=app_settings.PASSWORD_HASH_WORKERS,
+    max_pending=app_settings.PASSWORD_HASH_MAX_PENDING,
+)
+
+# Instagram Graph API (pooled async HTTP client)
+instagram_client = InstagramClient(
+    base_url=app_settings.INSTAGRAM_GRAPH_URL,
+    timeout=app_settings.INSTAGRAM_TIMEOUT,
+    max_retries=app_settings.INSTAGRAM_MAX_RETRIES,
+)
+
+# Verified admin principals, so authenticated calls skip the admins lookup
+principal_cache = ResponseCache(ttl=app_settings.AUTH_CACHE_TTL_SECONDS, max_bytes=app_settings.AUTH_CACHE_MAX_BYTES)
+
+# Read-through cache for public catalogue endpoints
+response_cache = ResponseCache(ttl=app_settings.CACHE_TTL_SECONDS, max_bytes=app_settings.CACHE_MAX_BYTES)
+CATALOGUE_NAMESPACES = ("cakes", "categories", "testimonials", "settings")
+# Cached views built from several collections (page bundles, dashboard stats)
+# go stale when any of them change
+DERIVED_NAMESPACES = {
+    "home": ("cakes", "testimonials", "settings"),
+    "gallery": ("cakes", "categories"),
+    "stats": ("cakes", "categories", "testimonials"),
+}
+collection_versions = CollectionVersions(ttl=app_settings.CACHE_TTL_SECONDS)
+
+def apply_remote_changes(namespaces: List[str]):
+    """Another worker wrote: drop what this one cached before the write."""
+    if "admins" in namespaces:
+        principal_cache.invalidate("admins")
+    response_cache.invalidate(*namespaces)
+    collection_versions.bump(*namespaces)
+
+shared_invalidations = SharedInvalidations(apply_remote_changes, interval=app_settings.CACHE_SYNC_INTERVAL)
+
+def mark_changed(*collections: str):
+    """Called by every write route: drops cached reads and bumps ETag versions, here and in the other workers."""
+    derived = [name for name, deps in DERIVED_NAMESPACES.items() if set(deps) & set(collections)]
+    response_cache.invalidate(*collections, *derived)
+    collection_versions.bump(*collections, *derived)
+    shared_invalidations.publish(*collections, *derived)
+
+# Background jobs
+job_runner = JobRunner(poll_interval=app_settings.JOB_POLL_INTERVAL, lease=app_settings.JOB_LEASE_SECONDS)
+
 # Create the main app
 app = FastAPI()
 
@@ -50,7 +141,9 @@ class AdminUser(BaseModel):
     email: str
     password_hash: str
     name: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    # Bumped to revoke every token issued before (logout, password change)
+    token_version: int = 0
+    created_at: datetime = Field(default_factory=utcnow)
 
 class AdminLogin(BaseModel):
     email: str
@@ -61,6 +154,10 @@ class AdminRegister(BaseModel):
     password: str
     name: str
 
+class PasswordChange(BaseModel):
+    current_password: str
+    new_password: str
+
 class TokenResponse(BaseModel):
     access_token: str
     token_type: str = "bearer"
@@ -71,7 +168,7 @@ class Category(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     name: str
     slug: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow)
 
 class CategoryCreate(BaseModel):
     name: str
@@ -87,7 +184,27 @@ class Cake(BaseModel):
     image_url: str
     instagram_url: Optional[str] = None
     featured: bool = False
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow)
+
+    @computed_field
+    @property
+    def images(self) -> Dict[str, Dict[str, str]]:
+        return variant_urls(self.image_url)
+
+class CakeListItem(Cake):
+    # Joined from categories when listing, so clients don't look names up per card
+    category_name: Optional[str] = None
+
+class CategoryCount(BaseModel):
+    category_id: str
+    name: Optional[str] = None
+    count: int
+
+class CakeFacets(BaseModel):
+    categories: List[CategoryCount]
+
+class CakePage(Page[CakeListItem]):
+    facets: Optional[CakeFacets] = None
 
 class CakeCreate(BaseModel):
     name: str
@@ -107,13 +224,39 @@ class CakeUpdate(BaseModel):
     instagram_url: Optional[str] = None
     featured: Optional[bool] = None
 
+# POST /cakes/bulk: one bulk_write for a whole batch
+BULK_MAX_OPERATIONS = 500
+
+class CakeBulkOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    # Target of update/delete
+    id: Optional[str] = None
+    # CakeCreate fields for create, CakeUpdate fields for update
+    data: Optional[dict] = None
+
+class CakeBulkRequest(BaseModel):
+    operations: List[CakeBulkOperation] = Field(..., min_length=1, max_length=BULK_MAX_OPERATIONS)
+
+class CakeBulkResult(BaseModel):
+    index: int
+    op: str
+    id: Optional[str] = None
+    status: Literal["ok", "not_found", "error"] = "ok"
+    error: Optional[str] = None
+
+class CakeBulkResponse(BaseModel):
+    results: List[CakeBulkResult]
+    created: int
+    updated: int
+    deleted: int
+
 class Testimonial(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     author_name: str
     content: str
     rating: int = 5
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(default_factory=utcnow)
 
 class TestimonialCreate(BaseModel):
     author_name: str
@@ -127,7 +270,7 @@ class SiteSettings(BaseModel):
     logo_url: str = ""
     instagram_access_token: Optional[str] = None
     instagram_user_id: Optional[str] = None
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=utcnow)
 
 class SiteSettingsUpdate(BaseModel):
     hero_image_url: Optional[str] = None
@@ -135,37 +278,126 @@ class SiteSettingsUpdate(BaseModel):
     instagram_access_token: Optional[str] = None
     instagram_user_id: Optional[str] = None
 
+class Job(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    kind: str
+    status: str
+    progress: dict = {}
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+# ==================== Pagination ====================
+
+async def fetch_page(collection, query: dict, limit: int, cursor: Optional[str], descending: bool = True,
+                     model: Optional[type] = None, projection: Optional[dict] = None,
+                     sort_field: str = "created_at"):
+    if projection is None and model:
+        projection = projection_for(model)
+    try:
+        docs, next_cursor = await paginate(collection, query, limit, cursor, projection,
+                                           descending=descending, sort_field=sort_field)
+    except InvalidCursor:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    if model:
+        docs = [apply_defaults(model, doc) for doc in docs]
+    return {"items": docs, "next_cursor": next_cursor}
+
+# ==================== Fast JSON ====================
+
+def json_response(content) -> Response:
+    # For routes without a response_model: same encoding (UTC datetimes
+    # as ...Z) as the model and FAST_JSON paths
+    return Response(dumps(content), media_type="application/json")
+
+def with_images(cake: dict) -> dict:
+    # What the Cake.images computed field returns, for responses that skip the model
+    cake["images"] = variant_urls(cake.get("image_url", ""))
+    return cake
+
+async def catalogue_response(request: Request, response: Response, namespace: str, key, load,
+                             encoded: bool = False):
+    """Serve a cached catalogue read.
+
+    The cache holds the encoded body and its gzip/brotli forms, built once
+    per write and served as-is. By default the documents first go through
+    the route's response_model, as FastAPI would do with a returned value;
+    FAST_JSON (or encoded=True, for shapes the response_model can't
+    validate) skips that and encodes them with orjson directly, as do
+    routes without a response_model.
+    """
+    field = getattr(request.scope.get("route"), "secure_cloned_response_field", None)
+    validate = field is not None and not (app_settings.FAST_JSON or encoded)
+
+    async def encode():
+        content = await load()
+        if validate:
+            content = await serialize_response(field=field, response_content=content)
+        return PrecompressedBody(dumps(content), minimum_size=app_settings.COMPRESSION_MIN_SIZE)
+    body = await response_cache.get_or_load(namespace, key, encode)
+    # A returned Response doesn't inherit headers set on the injected one (ETag...)
+    return body.response(request.headers.get("accept-encoding"), response.headers.raw)
+
 # ==================== Auth Utils ====================
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes")
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+async def verify_password(password: str, hashed: str) -> bool:
+    try:
+        return await password_hasher.verify(password, hashed)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Servidor ocupado, tente novamente em instantes")
 
-def create_token(user_id: str, email: str) -> str:
+def create_token(user_id: str, email: str, token_version: int = 0) -> str:
     payload = {
         "sub": user_id,
         "email": email,
+        "ver": token_version,
         "exp": datetime.now(timezone.utc) + timedelta(hours=JWT_EXPIRATION_HOURS)
     }
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
+async def load_principal(user_id: str) -> dict:
+    """Admin fields needed by handlers; None if the admin no longer exists."""
+    user = await db.admins.find_one(
+        {"id": user_id}, {"_id": 0, "id": 1, "email": 1, "name": 1, "token_version": 1}
+    )
+    if user is not None:
+        user.setdefault("token_version", 0)
+    return user
+
+def forget_principal(user_id: str):
+    principal_cache.delete("admins", user_id)
+    # Other workers may still hold the old token_version
+    shared_invalidations.publish("admins")
+
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     try:
         token = credentials.credentials
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("sub")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="Token inválido")
-        user = await db.admins.find_one({"id": user_id}, {"_id": 0})
-        if user is None:
-            raise HTTPException(status_code=401, detail="Usuário não encontrado")
-        return user
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expirado")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Token inválido")
+    
+    user_id = payload.get("sub")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="Token inválido")
+    # Hot path is signature verification only; Mongo is consulted on cache miss
+    user = await principal_cache.get_or_load("admins", user_id, lambda: load_principal(user_id))
+    if user is None:
+        principal_cache.delete("admins", user_id)
+        raise HTTPException(status_code=401, detail="Usuário não encontrado")
+    if payload.get("ver", 0) != user["token_version"]:
+        raise HTTPException(status_code=401, detail="Token revogado")
+    return user
 
 # ==================== Auth Routes ====================
 
@@ -177,11 +409,10 @@ async def register(data: AdminRegister):
     
     admin = AdminUser(
         email=data.email,
-        password_hash=hash_password(data.password),
+        password_hash=await hash_password(data.password),
         name=data.name
     )
-    doc = admin.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc = to_document(admin)
     await db.admins.insert_one(doc)
     
     token = create_token(admin.id, admin.email)
@@ -190,64 +421,99 @@ async def register(data: AdminRegister):
 @api_router.post("/auth/login", response_model=TokenResponse)
 async def login(data: AdminLogin):
     user = await db.admins.find_one({"email": data.email}, {"_id": 0})
-    if not user or not verify_password(data.password, user["password_hash"]):
+    if not user or not await verify_password(data.password, user["password_hash"]):
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
     
-    token = create_token(user["id"], user["email"])
+    # Upgrade hashes created with a lower work factor while we have the plaintext
+    if password_hasher.needs_rehash(user["password_hash"]):
+        try:
+            new_hash = await password_hasher.hash(data.password)
+            await db.admins.update_one(
+                {"id": user["id"], "password_hash": user["password_hash"]},
+                {"$set": {"password_hash": new_hash}}
+            )
+        except PasswordHasherBusy:
+            pass
+    
+    token = create_token(user["id"], user["email"], user.get("token_version", 0))
+    return TokenResponse(access_token=token, name=user["name"])
+
+@api_router.post("/auth/logout")
+async def logout(current_user: dict = Depends(get_current_user)):
+    """Revoke every token issued to this admin so far."""
+    await db.admins.update_one({"id": current_user["id"]}, {"$inc": {"token_version": 1}})
+    forget_principal(current_user["id"])
+    return {"message": "Sessão encerrada"}
+
+@api_router.put("/auth/password", response_model=TokenResponse)
+async def change_password(data: PasswordChange, current_user: dict = Depends(get_current_user)):
+    user = await db.admins.find_one({"id": current_user["id"]}, {"_id": 0})
+    if not user or not await verify_password(data.current_password, user["password_hash"]):
+        raise HTTPException(status_code=401, detail="Senha atual incorreta")
+    
+    new_version = user.get("token_version", 0) + 1
+    await db.admins.update_one(
+        {"id": user["id"]},
+        {"$set": {"password_hash": await hash_password(data.new_password), "token_version": new_version}}
+    )
+    forget_principal(user["id"])
+    
+    # Other sessions are logged out; this one continues with a fresh token
+    token = create_token(user["id"], user["email"], new_version)
     return TokenResponse(access_token=token, name=user["name"])
 
 @api_router.get("/auth/me")
 async def get_me(current_user: dict = Depends(get_current_user)):
     return {"id": current_user["id"], "email": current_user["email"], "name": current_user["name"]}
 
-@api_router.get("/test-db")
-async def test_db():
-    """Test MongoDB connection and return database stats"""
+@api_router.get("/health")
+async def health(response: Response):
+    """MongoDB round trip and connection pool counts; touches no collection."""
+    pool = {
+        "max_size": app_settings.MONGO_MAX_POOL_SIZE,
+        "min_size": app_settings.MONGO_MIN_POOL_SIZE,
+        **pool_stats.snapshot(),
+    }
+    started = time.perf_counter()
     try:
-        # Try to ping the database
-        await client.admin.command('ping')
-        
-        # Get collection stats
-        collections = await db.list_collection_names()
-        
-        admin_count = await db.admins.count_documents({})
-        cakes_count = await db.cakes.count_documents({})
-        categories_count = await db.categories.count_documents({})
-        
-        return {
-            "status": "connected",
-            "database": db_name,
-            "collections": collections,
-            "document_counts": {
-                "admins": admin_count,
-                "cakes": cakes_count,
-                "categories": categories_count
-            }
-        }
+        await db.command("ping")
     except Exception as e:
-        logger.error(f"Database connection error: {str(e)}")
-        return {
-            "status": "error",
-            "message": str(e),
-            "mongo_url": mongo_url[:50] + "..." if mongo_url else "Not set"
-        }
+        logger.error(f"Database health check failed: {str(e)}")
+        response.status_code = 503
+        return {"status": "unavailable", "database": db.name, "pool": pool}
+    return {
+        "status": "ok",
+        "database": db.name,
+        "ping_ms": round((time.perf_counter() - started) * 1000, 2),
+        "pool": pool,
+    }
 
 # ==================== Category Routes ====================
 
-@api_router.get("/categories", response_model=List[Category])
-async def get_categories():
-    categories = await db.categories.find({}, {"_id": 0}).to_list(100)
-    for cat in categories:
-        if isinstance(cat.get('created_at'), str):
-            cat['created_at'] = datetime.fromisoformat(cat['created_at'])
-    return categories
+@api_router.get("/categories", response_model=Page[Category])
+async def get_categories(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    key = ("list", limit, cursor)
+    not_modified = conditional_get(request, response, collection_versions, "categories", key)
+    if not_modified:
+        return not_modified
+    # Oldest first, so filter buttons keep the order categories were created in
+    return await catalogue_response(
+        request, response, "categories", key,
+        lambda: fetch_page(db.categories, {}, limit, cursor, descending=False, model=Category)
+    )
 
 @api_router.post("/categories", response_model=Category)
 async def create_category(data: CategoryCreate, current_user: dict = Depends(get_current_user)):
     category = Category(**data.model_dump())
-    doc = category.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc = to_document(category)
     await db.categories.insert_one(doc)
+    # Cake pages embed category names
+    mark_changed("categories", "cakes")
     return category
 
 @api_router.delete("/categories/{category_id}")
@@ -255,39 +521,197 @@ async def delete_category(category_id: str, current_user: dict = Depends(get_cur
     result = await db.categories.delete_one({"id": category_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Categoria não encontrada")
+    mark_changed("categories", "cakes")
     return {"message": "Categoria removida"}
 
+# ==================== Cake Views ====================
+
+# Summary shape for cake cards; the description is cut down inside the projection
+CARD_DESCRIPTION_LENGTH = 140
+CAKE_VIEWS = {
+    "card": ("id", "name", "description", "category_id", "image_url", "images", "featured"),
+}
+
+# sort= value -> (field, descending); pages are keyset-paginated on (field, id)
+CAKE_SORTS = {
+    "newest": ("created_at", True),
+    "oldest": ("created_at", False),
+    "price_asc": ("price", False),
+    "price_desc": ("price", True),
+}
+CakeSort = Literal["newest", "oldest", "price_asc", "price_desc"]
+
+# Fields computed per response rather than stored
+DERIVED_CAKE_FIELDS = ("images", "category_name")
+
+async def category_names() -> Dict[str, str]:
+    """id -> name for every category, cached until categories change."""
+    async def load():
+        return {
+            category["id"]: category["name"]
+            async for category in db.categories.find({}, {"_id": 0, "id": 1, "name": 1})
+        }
+    return await response_cache.get_or_load("categories", "names", load)
+
+async def category_facets(query: dict, names: Dict[str, str]) -> dict:
+    """Cakes per category among those matching query."""
+    pipeline = [
+        {"$match": query},
+        {"$group": {"_id": "$category_id", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+    ]
+    groups = await db.cakes.aggregate(pipeline).to_list(None)
+    return {"categories": [
+        {"category_id": group["_id"], "name": names.get(group["_id"]), "count": group["count"]}
+        for group in groups
+    ]}
+
+def cake_fields(fields: Optional[str], view: Optional[str]) -> Optional[tuple]:
+    """Parse fields=/view= into the cake fields to return, or None for full documents."""
+    if fields and view:
+        raise HTTPException(status_code=400, detail="Use fields ou view, não os dois")
+    if view:
+        if view not in CAKE_VIEWS:
+            raise HTTPException(status_code=400, detail=f"View inválida: {view}")
+        return CAKE_VIEWS[view]
+    if not fields:
+        return None
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in Cake.model_fields and name not in DERIVED_CAKE_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Campo inválido: {', '.join(unknown)}")
+    # id is always returned: the frontend keys lists by it
+    return tuple(dict.fromkeys(["id", *requested]))
+
+def cake_projection(selected: tuple, view: Optional[str] = None, sort_field: str = "created_at") -> dict:
+    # id and the sort field feed the page cursor; derived fields need their source
+    projection = {"_id": 0, "id": 1, sort_field: 1}
+    sources = {"images": "image_url", "category_name": "category_id"}
+    for name in selected:
+        projection[sources.get(name, name)] = 1
+    if view == "card":
+        projection["description"] = {"$substrCP": ["$description", 0, CARD_DESCRIPTION_LENGTH]}
+    return projection
+
+def with_category_name(cake: dict, names: Dict[str, str]) -> dict:
+    cake["category_name"] = names.get(cake.get("category_id"))
+    return cake
+
+def shape_cake(cake: dict, selected: tuple, names: Optional[Dict[str, str]] = None) -> dict:
+    if "images" in selected:
+        with_images(cake)
+    if "category_name" in selected:
+        with_category_name(cake, names or {})
+    return {name: cake[name] for name in selected if name in cake}
+
+async def load_cake_page(query: dict, limit: int, cursor: Optional[str], sort: str = "newest",
+                         selected: Optional[tuple] = None, view: Optional[str] = None) -> dict:
+    """One page of cakes: full list items, or only the selected fields."""
+    sort_field, descending = CAKE_SORTS[sort]
+    if selected is None:
+        page, names = await asyncio.gather(
+            fetch_page(db.cakes, query, limit, cursor, descending, model=Cake, sort_field=sort_field),
+            category_names(),
+        )
+        page["items"] = [with_category_name(with_images(cake), names) for cake in page["items"]]
+        return page
+    projection = cake_projection(selected, view, sort_field)
+    page = await fetch_page(db.cakes, query, limit, cursor, descending, projection=projection, sort_field=sort_field)
+    names = await category_names() if "category_name" in selected else None
+    page["items"] = [shape_cake(cake, selected, names) for cake in page["items"]]
+    return page
+
 # ==================== Cake Routes ====================
 
-@api_router.get("/cakes", response_model=List[Cake])
-async def get_cakes(category_id: Optional[str] = None, featured: Optional[bool] = None):
-    query = {}
+@api_router.get("/cakes", response_model=CakePage)
+async def get_cakes(
+    request: Request,
+    response: Response,
+    category_id: Optional[str] = None,
+    featured: Optional[bool] = None,
+    price_min: Optional[float] = Query(None, ge=0),
+    price_max: Optional[float] = Query(None, ge=0),
+    sort: CakeSort = "newest",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Campos separados por vírgula, ex.: id,name,images"),
+    view: Optional[str] = Query(None, description="Formato resumido: card"),
+    facets: bool = Query(False, description="Inclui a contagem de bolos por categoria")
+):
+    if price_min is not None and price_max is not None and price_min > price_max:
+        raise HTTPException(status_code=400, detail="Faixa de preço inválida")
+    selected = cake_fields(fields, view)
+    key = ("list", category_id, featured, price_min, price_max, sort, limit, cursor, selected, view, facets)
+    not_modified = conditional_get(request, response, collection_versions, "cakes", key)
+    if not_modified:
+        return not_modified
+    
+    # Facet counts ignore the category filter, so every category button gets a number
+    facet_query = {}
+    if featured is not None:
+        facet_query["featured"] = featured
+    if price_min is not None or price_max is not None:
+        facet_query["price"] = {}
+        if price_min is not None:
+            facet_query["price"]["$gte"] = price_min
+        if price_max is not None:
+            facet_query["price"]["$lte"] = price_max
+    query = dict(facet_query)
     if category_id:
         query["category_id"] = category_id
-    if featured is not None:
-        query["featured"] = featured
     
-    cakes = await db.cakes.find(query, {"_id": 0}).to_list(500)
-    for cake in cakes:
-        if isinstance(cake.get('created_at'), str):
-            cake['created_at'] = datetime.fromisoformat(cake['created_at'])
-    return cakes
+    async def load():
+        page = await load_cake_page(query, limit, cursor, sort, selected, view)
+        page["facets"] = await category_facets(facet_query, await category_names()) if facets else None
+        return page
+    # Partial cakes don't satisfy the Cake response model, so they skip validation
+    return await catalogue_response(request, response, "cakes", key, load, encoded=selected is not None)
+
+# Declared before /cakes/{cake_id} so "search" isn't taken for an id
+@api_router.get("/cakes/search", response_model=Page[CakeListItem])
+async def search_cakes(
+    request: Request,
+    response: Response,
+    q: str = Query(..., max_length=MAX_QUERY_LENGTH),
+    category_id: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    q = " ".join(q.split())
+    if len(q) < 2:
+        raise HTTPException(status_code=400, detail="Informe ao menos 2 caracteres para buscar")
+    key = ("search", q.lower(), category_id, limit, cursor)
+    not_modified = conditional_get(request, response, collection_versions, "cakes", key)
+    if not_modified:
+        return not_modified
+    
+    query = {"category_id": category_id} if category_id else None
+    
+    async def load():
+        try:
+            docs, next_cursor = await search(db.cakes, q, limit, cursor, projection_for(Cake), query)
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Cursor inválido")
+        names = await category_names()
+        items = [with_category_name(with_images(apply_defaults(Cake, cake)), names) for cake in docs]
+        return {"items": items, "next_cursor": next_cursor}
+    return await catalogue_response(request, response, "cakes", key, load)
 
 @api_router.get("/cakes/{cake_id}", response_model=Cake)
-async def get_cake(cake_id: str):
-    cake = await db.cakes.find_one({"id": cake_id}, {"_id": 0})
-    if not cake:
-        raise HTTPException(status_code=404, detail="Bolo não encontrado")
-    if isinstance(cake.get('created_at'), str):
-        cake['created_at'] = datetime.fromisoformat(cake['created_at'])
-    return cake
+async def get_cake(cake_id: str, request: Request, response: Response):
+    async def load():
+        cake = await db.cakes.find_one({"id": cake_id}, projection_for(Cake))
+        if not cake:
+            raise HTTPException(status_code=404, detail="Bolo não encontrado")
+        return with_images(apply_defaults(Cake, cake))
+    return await catalogue_response(request, response, "cakes", ("item", cake_id), load)
 
 @api_router.post("/cakes", response_model=Cake)
 async def create_cake(data: CakeCreate, current_user: dict = Depends(get_current_user)):
     cake = Cake(**data.model_dump())
-    doc = cake.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc = to_document(cake)
     await db.cakes.insert_one(doc)
+    mark_changed("cakes")
     return cake
 
 @api_router.put("/cakes/{cake_id}", response_model=Cake)
@@ -299,10 +723,9 @@ async def update_cake(cake_id: str, data: CakeUpdate, current_user: dict = Depen
     result = await db.cakes.update_one({"id": cake_id}, {"$set": update_data})
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Bolo não encontrado")
+    mark_changed("cakes")
     
     cake = await db.cakes.find_one({"id": cake_id}, {"_id": 0})
-    if isinstance(cake.get('created_at'), str):
-        cake['created_at'] = datetime.fromisoformat(cake['created_at'])
     return cake
 
 @api_router.delete("/cakes/{cake_id}")
@@ -310,34 +733,161 @@ async def delete_cake(cake_id: str, current_user: dict = Depends(get_current_use
     result = await db.cakes.delete_one({"id": cake_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Bolo não encontrado")
+    mark_changed("cakes")
     return {"message": "Bolo removido"}
 
+def validation_message(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(str(part) for part in e['loc'])}: {e['msg']}" for e in error.errors())
+
+@api_router.post("/cakes/bulk", response_model=CakeBulkResponse)
+async def bulk_cakes(data: CakeBulkRequest, current_user: dict = Depends(get_current_user)):
+    """Apply a batch of create/update/delete operations with a single bulk_write.
+
+    Each operation gets its own result: a bad item is reported and skipped
+    instead of failing the batch.
+    """
+    operations = data.operations
+    results = [CakeBulkResult(index=i, op=operation.op, id=operation.id) for i, operation in enumerate(operations)]
+    
+    # Updates and deletes of unknown ids are reported, not sent
+    target_ids = list({operation.id for operation in operations if operation.op != "create" and operation.id})
+    existing = set()
+    if target_ids:
+        existing = {
+            doc["id"] async for doc in db.cakes.find({"id": {"$in": target_ids}}, {"_id": 0, "id": 1})
+        }
+    
+    writes = []
+    written = []  # result for each entry of writes
+    seen_ids = set()
+    for operation, result in zip(operations, results):
+        try:
+            if operation.op == "create":
+                cake = Cake(**CakeCreate(**(operation.data or {})).model_dump())
+                result.id = cake.id
+                write = InsertOne(to_document(cake))
+            else:
+                if not operation.id:
+                    raise ValueError("id obrigatório")
+                # An unordered bulk_write may apply operations in any order
+                if operation.id in seen_ids:
+                    raise ValueError("Bolo repetido no lote")
+                seen_ids.add(operation.id)
+                if operation.id not in existing:
+                    result.status = "not_found"
+                    continue
+                if operation.op == "update":
+                    update_data = {k: v for k, v in CakeUpdate(**(operation.data or {})).model_dump().items() if v is not None}
+                    if not update_data:
+                        raise ValueError("Nenhum dado para atualizar")
+                    write = UpdateOne({"id": operation.id}, {"$set": update_data})
+                else:
+                    write = DeleteOne({"id": operation.id})
+        except ValidationError as e:
+            result.status, result.error = "error", validation_message(e)
+            continue
+        except ValueError as e:
+            result.status, result.error = "error", str(e)
+            continue
+        writes.append(write)
+        written.append(result)
+    
+    if writes:
+        try:
+            await db.cakes.bulk_write(writes, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                result = written[error["index"]]
+                result.status, result.error = "error", error.get("errmsg", "Erro ao gravar")
+        mark_changed("cakes")
+    
+    def count(op: str) -> int:
+        return sum(1 for result in results if result.op == op and result.status == "ok")
+    return CakeBulkResponse(results=results, created=count("create"), updated=count("update"), deleted=count("delete"))
+
 # ==================== Image Upload Route ====================
 
 @api_router.post("/upload")
 async def upload_image(file: UploadFile = File(...), current_user: dict = Depends(get_current_user)):
     contents = await file.read()
-    base64_image = base64.b64encode(contents).decode('utf-8')
-    content_type = file.content_type or 'image/jpeg'
-    data_url = f"data:{content_type};base64,{base64_image}"
-    return {"url": data_url}
+    if not contents:
+        raise HTTPException(status_code=400, detail="Arquivo vazio")
+    # The type comes from the bytes, not from the client
+    content_type = sniff_image_type(contents)
+    if content_type is None:
+        raise HTTPException(status_code=400, detail="Formato não suportado. Envie uma imagem JPEG, PNG, WebP ou GIF")
+    blob = await blob_store.put(contents, content_type)
+    image_pipeline.schedule(blob.key, contents)
+    url = blob_url(blob.key)
+    return {"url": url, "hash": blob.key, "size": blob.size, "images": variant_urls(url)}
+
+def image_response(blob, cache_control: str) -> StreamingResponse:
+    headers = {
+        "Cache-Control": cache_control,
+        "ETag": f'"{blob.key}"',
+        "Content-Length": str(blob.size),
+        # Browsers must not second-guess the type into HTML or SVG
+        "X-Content-Type-Options": "nosniff",
+    }
+    # Blobs stored before uploads were sniffed may carry any type
+    media_type = blob.content_type if blob.content_type in IMAGE_CONTENT_TYPES else "application/octet-stream"
+    return StreamingResponse(blob_store.iter_chunks(blob.key), media_type=media_type, headers=headers)
+
+@api_router.get("/images/{image_hash}")
+async def get_image(image_hash: str):
+    if not is_valid_key(image_hash):
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+    try:
+        blob = await blob_store.stat(image_hash)
+    except BlobNotFound:
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+    # Content-addressed: the bytes behind a hash never change
+    return image_response(blob, "public, max-age=31536000, immutable")
+
+@api_router.get("/images/{image_hash}/{variant}.{fmt}")
+async def get_image_variant(image_hash: str, variant: str, fmt: str):
+    if not is_valid_key(image_hash) or variant not in VARIANTS or fmt not in FORMATS:
+        raise HTTPException(status_code=404, detail="Imagem não encontrada")
+    try:
+        blob = await blob_store.stat(variant_key(image_hash, variant, fmt))
+        cache_control = "public, max-age=31536000, immutable"
+    except BlobNotFound:
+        # Not generated yet (or uploaded before variants existed): serve the
+        # original for now and make sure the variants get built, unless
+        # rendering them has already failed
+        try:
+            blob = await blob_store.stat(image_hash)
+        except BlobNotFound:
+            raise HTTPException(status_code=404, detail="Imagem não encontrada")
+        if not image_pipeline.failed(image_hash):
+            image_pipeline.schedule(image_hash)
+        cache_control = "no-cache"
+    return image_response(blob, cache_control)
 
 # ==================== Testimonial Routes ====================
 
-@api_router.get("/testimonials", response_model=List[Testimonial])
-async def get_testimonials():
-    testimonials = await db.testimonials.find({}, {"_id": 0}).to_list(100)
-    for t in testimonials:
-        if isinstance(t.get('created_at'), str):
-            t['created_at'] = datetime.fromisoformat(t['created_at'])
-    return testimonials
+@api_router.get("/testimonials", response_model=Page[Testimonial])
+async def get_testimonials(
+    request: Request,
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
+):
+    key = ("list", limit, cursor)
+    not_modified = conditional_get(request, response, collection_versions, "testimonials", key)
+    if not_modified:
+        return not_modified
+    return await catalogue_response(
+        request, response, "testimonials", key,
+        lambda: fetch_page(db.testimonials, {}, limit, cursor, model=Testimonial)
+    )
 
 @api_router.post("/testimonials", response_model=Testimonial)
 async def create_testimonial(data: TestimonialCreate, current_user: dict = Depends(get_current_user)):
     testimonial = Testimonial(**data.model_dump())
-    doc = testimonial.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
+    doc = to_document(testimonial)
     await db.testimonials.insert_one(doc)
+    mark_changed("testimonials")
     return testimonial
 
 @api_router.delete("/testimonials/{testimonial_id}")
@@ -345,12 +895,19 @@ async def delete_testimonial(testimonial_id: str, current_user: dict = Depends(g
     result = await db.testimonials.delete_one({"id": testimonial_id})
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Depoimento não encontrado")
+    mark_changed("testimonials")
     return {"message": "Depoimento removido"}
 
 # ==================== Site Settings Routes ====================
 
 @api_router.get("/settings")
-async def get_settings():
+async def get_settings(request: Request, response: Response):
+    not_modified = conditional_get(request, response, collection_versions, "settings", "public")
+    if not_modified:
+        return not_modified
+    return await catalogue_response(request, response, "settings", "public", load_public_settings)
+
+async def load_public_settings():
     settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
     if not settings:
         # Return defaults
@@ -376,116 +933,178 @@ async def get_settings_admin(current_user: dict = Depends(get_current_user)):
             "instagram_access_token": "",
             "instagram_user_id": ""
         }
-    return settings
+    return json_response(settings)
 
 @api_router.put("/settings")
 async def update_settings(data: SiteSettingsUpdate, current_user: dict = Depends(get_current_user)):
     update_data = {k: v for k, v in data.model_dump().items() if v is not None}
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    update_data["updated_at"] = utcnow()
     
     result = await db.settings.update_one(
         {"id": "site_settings"},
         {"$set": update_data},
         upsert=True
     )
+    mark_changed("settings")
     
     settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
-    return settings
+    return json_response(settings)
+
+# ==================== Page Bundles ====================
+
+HOME_FEATURED_LIMIT = 4
+
+@api_router.get("/home")
+async def get_home(request: Request, response: Response):
+    """Everything the home page renders, in one round trip."""
+    not_modified = conditional_get(request, response, collection_versions, "home", "home")
+    if not_modified:
+        return not_modified
+
+    async def load():
+        card = CAKE_VIEWS["card"]
+        featured, testimonials, settings = await asyncio.gather(
+            fetch_page(db.cakes, {"featured": True}, HOME_FEATURED_LIMIT, None,
+                       projection=cake_projection(card, "card")),
+            fetch_page(db.testimonials, {}, DEFAULT_PAGE_SIZE, None, model=Testimonial),
+            load_public_settings(),
+        )
+        return {
+            "featured_cakes": [shape_cake(cake, card) for cake in featured["items"]],
+            "testimonials": testimonials["items"],
+            "settings": settings,
+        }
+    return await catalogue_response(request, response, "home", "home", load)
+
+@api_router.get("/gallery")
+async def get_gallery(
+    request: Request,
+    response: Response,
+    category_id: Optional[str] = None,
+    sort: CakeSort = "newest",
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+):
+    """Categories plus the first page of cakes (with category counts); later pages come from GET /cakes?cursor=."""
+    key = (category_id, sort, limit)
+    not_modified = conditional_get(request, response, collection_versions, "gallery", key)
+    if not_modified:
+        return not_modified
+
+    async def load():
+        query = {"category_id": category_id} if category_id else {}
+        categories, cakes, names = await asyncio.gather(
+            fetch_page(db.categories, {}, MAX_PAGE_SIZE, None, descending=False, model=Category),
+            load_cake_page(query, limit, None, sort),
+            category_names(),
+        )
+        cakes["facets"] = await category_facets({}, names)
+        return {"categories": categories["items"], "cakes": cakes}
+    return await catalogue_response(request, response, "gallery", key, load)
 
 # ==================== Instagram Sync Route ====================
 
-@api_router.post("/instagram/sync")
-async def sync_instagram(current_user: dict = Depends(get_current_user)):
+INSTAGRAM_SYNC_JOB = "instagram_sync"
+
+def instagram_configured(settings: Optional[dict]) -> bool:
+    return bool(settings and settings.get("instagram_access_token") and settings.get("instagram_user_id"))
+
+async def run_instagram_sync(job: dict, report_progress) -> dict:
+    """Job handler: import Instagram media, only newer than the last seen post when incremental."""
+    settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
+    if not instagram_configured(settings):
+        raise ValueError("Instagram não configurado")
+    
+    last_media_at = settings.get("instagram_last_media_at")
+    since = last_media_at if job["params"].get("incremental") else None
+    
+    imported = 0
+
+    async def on_progress(progress: dict):
+        # Each page is inserted before it is reported, so new cakes become
+        # visible page by page: drop cached lists as they land
+        nonlocal imported
+        if progress["imported"] > imported:
+            imported = progress["imported"]
+            mark_changed("cakes")
+        await report_progress(progress)
+    
+    try:
+        counts = await import_media(
+            db, instagram_client,
+            settings["instagram_user_id"], settings["instagram_access_token"],
+            since=since, on_progress=on_progress
+        )
+    except InstagramError as e:
+        raise ValueError(f"Erro ao acessar Instagram API: {str(e)}")
+    except InstagramUnavailable as e:
+        raise ValueError(f"Erro de conexão: {str(e)}")
+    finally:
+        mark_changed("cakes")
+    
+    latest = counts["latest_timestamp"]
+    if latest and (not last_media_at or latest > last_media_at):
+        await db.settings.update_one({"id": "site_settings"}, {"$set": {"instagram_last_media_at": latest}})
+        mark_changed("settings")
+    return counts
+
+job_runner.register(INSTAGRAM_SYNC_JOB, run_instagram_sync)
+
+async def instagram_sync_enabled() -> bool:
+    settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
+    return instagram_configured(settings)
+
+instagram_scheduler = PeriodicScheduler(
+    job_runner, INSTAGRAM_SYNC_JOB,
+    interval=app_settings.INSTAGRAM_SYNC_INTERVAL_MINUTES * 60,
+    params={"incremental": True},
+    enabled=instagram_sync_enabled,
+)
+
+@api_router.post("/instagram/sync", status_code=202)
+async def sync_instagram(full: bool = False, current_user: dict = Depends(get_current_user)):
     """
-    Sync photos from Instagram using Graph API.
+    Enqueue a sync of photos from Instagram using Graph API.
     Requires instagram_access_token and instagram_user_id in settings.
+    Only media newer than the last synced post is imported unless full=true.
+    Poll GET /api/jobs/{job_id} for progress.
     """
     settings = await db.settings.find_one({"id": "site_settings"}, {"_id": 0})
     
-    if not settings or not settings.get("instagram_access_token") or not settings.get("instagram_user_id"):
+    if not instagram_configured(settings):
         raise HTTPException(
             status_code=400, 
             detail="Instagram não configurado. Configure o Access Token e User ID nas configurações."
         )
     
-    import requests
-    
-    access_token = settings["instagram_access_token"]
-    user_id = settings["instagram_user_id"]
-    
-    try:
-        # Fetch media from Instagram Graph API
-        url = f"https://graph.instagram.com/{user_id}/media"
-        params = {
-            "fields": "id,caption,media_type,media_url,thumbnail_url,permalink,timestamp",
-            "access_token": access_token,
-            "limit": 20
-        }
-        
-        response = requests.get(url, params=params)
-        
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Erro ao acessar Instagram API: {response.json().get('error', {}).get('message', 'Token inválido ou expirado')}"
-            )
-        
-        data = response.json()
-        media_items = data.get("data", [])
-        
-        # Get default category
-        default_category = await db.categories.find_one({}, {"_id": 0})
-        category_id = default_category["id"] if default_category else "cat-especial"
-        
-        imported_count = 0
-        
-        for item in media_items:
-            if item["media_type"] not in ["IMAGE", "CAROUSEL_ALBUM"]:
-                continue
-            
-            # Check if already imported
-            existing = await db.cakes.find_one({"instagram_url": item["permalink"]}, {"_id": 0})
-            if existing:
-                continue
-            
-            # Get image URL
-            image_url = item.get("media_url") or item.get("thumbnail_url")
-            if not image_url:
-                continue
-            
-            # Create cake entry
-            cake = {
-                "id": str(uuid.uuid4()),
-                "name": (item.get("caption") or "Criação Paula Veiga")[:50],
-                "description": item.get("caption") or "Mais uma delícia da Paula Veiga!",
-                "price": 0,
-                "category_id": category_id,
-                "image_url": image_url,
-                "instagram_url": item["permalink"],
-                "featured": False,
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            
-            await db.cakes.insert_one(cake)
-            imported_count += 1
-        
-        return {"message": f"{imported_count} fotos importadas do Instagram com sucesso!"}
-        
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"Erro de conexão: {str(e)}")
+    job = await job_runner.enqueue(INSTAGRAM_SYNC_JOB, {"incremental": not full}, exclusive=True)
+    if job is None:
+        active = await job_runner.find_active(INSTAGRAM_SYNC_JOB)
+        if active is None:
+            # It finished between the two queries
+            raise HTTPException(status_code=409, detail="Sincronização já em andamento, tente novamente")
+        return {"job_id": active["id"], "status": active["status"], "message": "Sincronização já em andamento"}
+    return {"job_id": job["id"], "status": job["status"], "message": "Sincronização iniciada"}
+
+# ==================== Job Routes ====================
+
+@api_router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    job = await job_runner.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Tarefa não encontrada")
+    return job
+
+# ==================== Cache Route ====================
+
+@api_router.get("/cache/stats")
+async def get_cache_stats(current_user: dict = Depends(get_current_user)):
+    return response_cache.stats()
 
 # ==================== Stats Route ====================
 
 @api_router.get("/stats")
 async def get_stats(current_user: dict = Depends(get_current_user)):
-    cakes_count = await db.cakes.count_documents({})
-    categories_count = await db.categories.count_documents({})
-    testimonials_count = await db.testimonials.count_documents({})
-    return {
-        "cakes": cakes_count,
-        "categories": categories_count,
-        "testimonials": testimonials_count
-    }
+    return await response_cache.get_or_load("stats", "dashboard", lambda: compute_stats(db))
 
 # ==================== Seed Data Route ====================
 
@@ -500,9 +1119,9 @@ async def seed_data():
     
     # Create categories
     categories_data = [
-        {"id": "cat-aniversario", "name": "Aniversário", "slug": "aniversario", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": "cat-casamento", "name": "Casamento", "slug": "casamento", "created_at": datetime.now(timezone.utc).isoformat()},
-        {"id": "cat-especial", "name": "Ocasiões Especiais", "slug": "especial", "created_at": datetime.now(timezone.utc).isoformat()},
+        {"id": "cat-aniversario", "name": "Aniversário", "slug": "aniversario", "created_at": utcnow()},
+        {"id": "cat-casamento", "name": "Casamento", "slug": "casamento", "created_at": utcnow()},
+        {"id": "cat-especial", "name": "Ocasiões Especiais", "slug": "especial", "created_at": utcnow()},
     ]
     await db.categories.insert_many(categories_data)
     
@@ -516,7 +1135,7 @@ async def seed_data():
             "category_id": "cat-aniversario",
             "image_url": "https://images.unsplash.com/photo-1586788680434-30d324b2d46f?w=600",
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
@@ -526,7 +1145,7 @@ async def seed_data():
             "category_id": "cat-aniversario",
             "image_url": "https://images.unsplash.com/photo-1578985545062-69928b1d9587?w=600",
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
@@ -536,7 +1155,7 @@ async def seed_data():
             "category_id": "cat-casamento",
             "image_url": "https://images.unsplash.com/photo-1535254973040-607b474cb50d?w=600",
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
@@ -546,7 +1165,7 @@ async def seed_data():
             "category_id": "cat-casamento",
             "image_url": "https://images.unsplash.com/photo-1464349095431-e9a21285b5f3?w=600",
             "featured": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
@@ -556,7 +1175,7 @@ async def seed_data():
             "category_id": "cat-especial",
             "image_url": "https://images.unsplash.com/photo-1565958011703-44f9829ba187?w=600",
             "featured": False,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
@@ -566,7 +1185,7 @@ async def seed_data():
             "category_id": "cat-especial",
             "image_url": "https://images.unsplash.com/photo-1558301211-0d8c8ddee6ec?w=600",
             "featured": True,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
     ]
     await db.cakes.insert_many(cakes_data)
@@ -578,27 +1197,54 @@ async def seed_data():
             "author_name": "Maria Silva",
             "content": "O bolo do casamento da minha filha ficou simplesmente perfeito! Todos os convidados elogiaram muito. Obrigada Paula!",
             "rating": 5,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
             "author_name": "João Santos",
             "content": "Encomendei um bolo de aniversário para minha esposa e ela amou! Além de lindo, estava delicioso.",
             "rating": 5,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
         {
             "id": str(uuid.uuid4()),
             "author_name": "Ana Paula Costa",
             "content": "Profissionalismo e carinho em cada detalhe. Já é a terceira vez que encomendo e sempre supera minhas expectativas!",
             "rating": 5,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": utcnow()
         },
     ]
     await db.testimonials.insert_many(testimonials_data)
+    mark_changed(*CATALOGUE_NAMESPACES)
     
     return {"message": "Dados iniciais criados com sucesso"}
 
+# ==================== Metrics Route ====================
+
+@api_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(current_user: dict = Depends(get_current_user)):
+    """Prometheus text exposition of request and MongoDB timings."""
+    if not app_settings.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Métricas desativadas")
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+# ==================== Profiler Routes ====================
+
+@api_router.get("/profiles")
+async def list_profiles(current_user: dict = Depends(get_current_user)):
+    """Captured request profiles, newest first."""
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiler desativado")
+    return json_response([profile.summary() for profile in reversed(profiler.profiles)])
+
+@api_router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str, current_user: dict = Depends(get_current_user)):
+    """One profile in collapsed-stack format, for flamegraph.pl or speedscope."""
+    profile = profiler.get(profile_id) if profiler is not None else None
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return PlainTextResponse(profile.collapsed())
+
 # ==================== Base Route ====================
 
 @api_router.get("/")
@@ -617,6 +1263,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/brotli for API responses (precompressed catalogue bodies pass through)
+app.add_middleware(CompressionMiddleware, minimum_size=app_settings.COMPRESSION_MIN_SIZE)
+
+if profiler is not None:
+    app.add_middleware(ProfilerMiddleware, profiler=profiler)
+
+# Added last so it is outermost: timings and sizes include compression
+if app_settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -625,26 +1281,53 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 @app.on_event("startup")
 async def startup_event():
-    """Initialize default admin user if not exists"""
+    """Connect, ensure indexes and initialize default admin user if not exists"""
+    # Tests and benchmarks may have set up a client already
+    if client is None:
+        connect()
     try:
-        existing_admin = await db.admins.find_one({"email": "admin@paulaveiga.com"})
+        log_report(await ensure_indexes(db))
+    except Exception as e:
+        logger.error(f"Error ensuring indexes: {str(e)}")
+    try:
+        await shared_invalidations.start(db)
+    except Exception as e:
+        logger.error(f"Error reading cache invalidations: {str(e)}")
+    job_runner.start(db)
+    instagram_scheduler.start()
+    try:
+        existing_admin = await db.admins.find_one({"email": "admin@paulaveiga.com"}, {"_id": 1})
+        created = False
         if not existing_admin:
             # Hash password properly
-            password_hash = bcrypt.hashpw("senha123".encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            default_admin = {
-                "id": str(uuid.uuid4()),
-                "email": "admin@paulaveiga.com",
-                "password_hash": password_hash,
-                "name": "Paula Veiga",
-                "created_at": datetime.now(timezone.utc).isoformat()
-            }
-            await db.admins.insert_one(default_admin)
-            logger.info("Default admin user created successfully")
-        else:
-            logger.info("Admin user already exists")
+            password_hash = await password_hasher.hash("senha123")
+            # Every worker runs this at the same time: only the upsert that
+            # inserts (guarded by the unique email index) creates the admin
+            result = await db.admins.update_one(
+                {"email": "admin@paulaveiga.com"},
+                {"$setOnInsert": {
+                    "id": str(uuid.uuid4()),
+                    "password_hash": password_hash,
+                    "name": "Paula Veiga",
+                    "created_at": utcnow()
+                }},
+                upsert=True,
+            )
+            created = result.upserted_id is not None
+        logger.info("Default admin user created successfully" if created else "Admin user already exists")
+    except DuplicateKeyError:
+        # Lost the race to another worker's upsert
+        logger.info("Admin user already exists")
     except Exception as e:
         logger.error(f"Error during startup: {str(e)}")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await instagram_scheduler.stop()
+    await job_runner.stop()
+    await shared_invalidations.stop()
+    await image_pipeline.shutdown()
+    password_hasher.shutdown()
+    await instagram_client.aclose()
+    if client is not None:
+        client.close()
@@ -0,0 +1,70 @@
+"""
+Admin dashboard statistics.
+
+Totals come from collection metadata (estimated_document_count) instead
+of scanning with count_documents; the cake breakdowns come from a single
+$facet aggregation and the rating average from a $group over
+testimonials. All of it is issued concurrently.
+"""
+import asyncio
+from typing import Dict, Iterable, Optional
+
+CAKE_BREAKDOWN_PIPELINE = [
+    {"$facet": {
+        "featured": [
+            {"$match": {"featured": True}},
+            {"$count": "count"},
+        ],
+        "by_category": [
+            {"$group": {"_id": "$category_id", "count": {"$sum": 1}}},
+            {"$lookup": {"from": "categories", "localField": "_id", "foreignField": "id", "as": "category"}},
+            {"$sort": {"count": -1, "_id": 1}},
+        ],
+    }},
+]
+
+RATING_PIPELINE = [
+    {"$group": {"_id": None, "average": {"$avg": "$rating"}}},
+]
+
+
+async def estimated_counts(db, collections: Iterable[str]) -> Dict[str, int]:
+    collections = list(collections)
+    counts = await asyncio.gather(*(db[name].estimated_document_count() for name in collections))
+    return dict(zip(collections, counts))
+
+
+async def cake_breakdown(db) -> dict:
+    result = await db.cakes.aggregate(CAKE_BREAKDOWN_PIPELINE).to_list(1)
+    facets = result[0] if result else {}
+    featured = facets.get("featured") or [{"count": 0}]
+    by_category = [
+        {
+            "category_id": group["_id"],
+            "name": group["category"][0].get("name") if group["category"] else None,
+            "count": group["count"],
+        }
+        for group in facets.get("by_category", [])
+    ]
+    return {"featured": featured[0]["count"], "by_category": by_category}
+
+
+async def average_rating(db) -> Optional[float]:
+    result = await db.testimonials.aggregate(RATING_PIPELINE).to_list(1)
+    if not result or result[0].get("average") is None:
+        return None
+    return round(result[0]["average"], 2)
+
+
+async def compute_stats(db) -> dict:
+    counts, cakes, rating = await asyncio.gather(
+        estimated_counts(db, ("cakes", "categories", "testimonials")),
+        cake_breakdown(db),
+        average_rating(db),
+    )
+    return {
+        **counts,
+        "featured_cakes": cakes["featured"],
+        "cakes_by_category": cakes["by_category"],
+        "average_rating": rating,
+    }
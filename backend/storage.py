@@ -0,0 +1,238 @@
+"""
+Content-addressed blob storage for uploaded images.
+
+Blobs are keyed by the SHA-256 of their bytes, so uploading the same
+image twice stores it once. The API serves them from /api/images/{hash};
+that path is what gets saved in cakes.image_url and the site settings.
+"""
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, Optional, Tuple
+from urllib.parse import unquote_to_bytes
+
+IMAGE_URL_PREFIX = "/api/images/"
+CHUNK_SIZE = 64 * 1024
+
+_HASH_RE = re.compile(r"^[0-9a-f]{64}$")
+_DATA_URL_RE = re.compile(r"^data:(?P<type>[\w.+-]+/[\w.+-]+)?(?P<b64>;base64)?,(?P<data>.*)$", re.DOTALL)
+
+
+class BlobNotFound(Exception):
+    pass
+
+
+@dataclass
+class BlobInfo:
+    key: str
+    content_type: str
+    size: int
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_valid_key(key: str) -> bool:
+    return bool(_HASH_RE.match(key))
+
+
+def blob_url(key: str) -> str:
+    return f"{IMAGE_URL_PREFIX}{key}"
+
+
+def parse_data_url(url: str) -> Optional[Tuple[str, bytes]]:
+    """Decode a data: URL into (content_type, bytes), or None if it isn't one."""
+    match = _DATA_URL_RE.match(url or "")
+    if not match:
+        return None
+    content_type = match.group("type") or "application/octet-stream"
+    payload = match.group("data")
+    try:
+        if match.group("b64"):
+            data = base64.b64decode(payload, validate=False)
+        else:
+            data = unquote_to_bytes(payload)
+    except (binascii.Error, ValueError):
+        return None
+    return content_type, data
+
+
+class BlobStore(ABC):
+    """Storage backend interface. Implementations must be safe to share across requests."""
+
+    async def put(self, data: bytes, content_type: str, key: Optional[str] = None) -> BlobInfo:
+        """Store data under its content hash, or under an explicit derived key."""
+        key = key or content_hash(data)
+        info = BlobInfo(key=key, content_type=content_type, size=len(data))
+        if not await self.exists(key):
+            await self._write(info, data)
+        return info
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def stat(self, key: str) -> BlobInfo:
+        """Return blob metadata or raise BlobNotFound."""
+
+    @abstractmethod
+    def iter_chunks(self, key: str) -> AsyncIterator[bytes]:
+        ...
+
+    @abstractmethod
+    async def _write(self, info: BlobInfo, data: bytes) -> None:
+        ...
+
+
+class LocalBlobStore(BlobStore):
+    """Stores blobs on local disk as <root>/<ab>/<hash> with a small JSON sidecar."""
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    async def exists(self, key: str) -> bool:
+        return await asyncio.to_thread(self._path(key).exists)
+
+    async def stat(self, key: str) -> BlobInfo:
+        def _stat():
+            path = self._path(key)
+            if not path.exists():
+                raise BlobNotFound(key)
+            try:
+                meta = json.loads(self._meta_path(key).read_text())
+            except (OSError, ValueError):
+                meta = {}
+            return BlobInfo(
+                key=key,
+                content_type=meta.get("content_type", "application/octet-stream"),
+                size=path.stat().st_size,
+            )
+        return await asyncio.to_thread(_stat)
+
+    async def iter_chunks(self, key: str) -> AsyncIterator[bytes]:
+        f = await asyncio.to_thread(open, self._path(key), "rb")
+        try:
+            while True:
+                chunk = await asyncio.to_thread(f.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            f.close()
+
+    async def _write(self, info: BlobInfo, data: bytes) -> None:
+        def _write_files():
+            path = self._path(info.key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Sidecar first, so a blob on disk always has its content type
+            _replace_atomically(self._meta_path(info.key), json.dumps({"content_type": info.content_type}).encode())
+            _replace_atomically(path, data)
+        await asyncio.to_thread(_write_files)
+
+
+def _replace_atomically(path: Path, data: bytes):
+    """Write via a uniquely named temp file, so a crash never leaves a truncated
+    file and concurrent writers of the same key (same bytes) never collide."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        os.replace(tmp.name, path)
+    except OSError:
+        os.unlink(tmp.name)
+        # Content-addressed: whoever got there first wrote the same bytes
+        if not path.exists():
+            raise
+
+
+class S3BlobStore(BlobStore):
+    """Stores blobs in an S3-compatible bucket. boto3 calls run in a worker thread."""
+
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None,
+                 region: Optional[str] = None):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix
+        self.s3 = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+
+    def _object_key(self, key: str) -> str:
+        return f"{self.prefix}{key}"
+
+    async def exists(self, key: str) -> bool:
+        try:
+            await self.stat(key)
+            return True
+        except BlobNotFound:
+            return False
+
+    async def stat(self, key: str) -> BlobInfo:
+        from botocore.exceptions import ClientError
+        try:
+            head = await asyncio.to_thread(
+                self.s3.head_object, Bucket=self.bucket, Key=self._object_key(key)
+            )
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                raise BlobNotFound(key)
+            raise
+        return BlobInfo(
+            key=key,
+            content_type=head.get("ContentType", "application/octet-stream"),
+            size=head["ContentLength"],
+        )
+
+    async def iter_chunks(self, key: str) -> AsyncIterator[bytes]:
+        obj = await asyncio.to_thread(
+            self.s3.get_object, Bucket=self.bucket, Key=self._object_key(key)
+        )
+        body = obj["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def _write(self, info: BlobInfo, data: bytes) -> None:
+        await asyncio.to_thread(
+            self.s3.put_object,
+            Bucket=self.bucket,
+            Key=self._object_key(info.key),
+            Body=data,
+            ContentType=info.content_type,
+            CacheControl="public, max-age=31536000, immutable",
+        )
+
+
+def create_blob_store(settings) -> BlobStore:
+    backend = settings.BLOB_BACKEND.lower()
+    if backend == "local":
+        return LocalBlobStore(settings.BLOB_STORAGE_PATH)
+    if backend == "s3":
+        if not settings.S3_BUCKET:
+            raise ValueError("BLOB_BACKEND=s3 requires S3_BUCKET")
+        return S3BlobStore(
+            settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            region=settings.S3_REGION,
+        )
+    raise ValueError(f"Unknown BLOB_BACKEND: {settings.BLOB_BACKEND}")
@@ -161,7 +161,7 @@ class BakeryAPITester:
         )
         
         if success:
-            categories = response if isinstance(response, list) else []
+            categories = response.get("items", []) if isinstance(response, dict) else []
             print(f"  Found {len(categories)} categories")
             if categories:
                 print(f"  First category: {categories[0].get('name', 'N/A')}")
@@ -202,7 +202,7 @@ class BakeryAPITester:
         )
         
         if success:
-            cakes = response if isinstance(response, list) else []
+            cakes = response.get("items", []) if isinstance(response, dict) else []
             print(f"  Found {len(cakes)} cakes")
             if cakes:
                 print(f"  First cake: {cakes[0].get('name', 'N/A')} - R${cakes[0].get('price', 0)}")
@@ -218,7 +218,7 @@ class BakeryAPITester:
         )
         
         if success:
-            cakes = response if isinstance(response, list) else []
+            cakes = response.get("items", []) if isinstance(response, dict) else []
             print(f"  Found {len(cakes)} featured cakes")
         return success
 
@@ -311,7 +311,7 @@ class BakeryAPITester:
         )
         
         if success:
-            testimonials = response if isinstance(response, list) else []
+            testimonials = response.get("items", []) if isinstance(response, dict) else []
             print(f"  Found {len(testimonials)} testimonials")
             if testimonials:
                 print(f"  First testimonial by: {testimonials[0].get('author_name', 'N/A')}")
@@ -1,5 +1,6 @@
 import React from 'react';
 import { motion } from 'framer-motion';
+import { resolveImageUrl } from '@/lib/utils';
 
 export const CakeCard = ({ cake, onClick, showPrice = false }) => {
   return (
@@ -10,12 +11,17 @@ export const CakeCard = ({ cake, onClick, showPrice = false }) => {
       data-testid={`cake-card-${cake.id}`}
     >
       <div className="img-hover-zoom aspect-square relative">
-        <img
-          src={cake.image_url}
-          alt={cake.name}
-          className="w-full h-full object-cover"
-          loading="lazy"
-        />
+        <picture>
+          {cake.images?.card && (
+            <source srcSet={resolveImageUrl(cake.images.card.webp)} type="image/webp" />
+          )}
+          <img
+            src={resolveImageUrl(cake.images?.card?.jpeg || cake.image_url)}
+            alt={cake.name}
+            className="w-full h-full object-cover"
+            loading="lazy"
+          />
+        </picture>
         {cake.featured && (
           <span className="absolute top-4 right-4 bg-paula-brown-dark text-white text-xs font-semibold px-3 py-1 rounded-full">
             Destaque
@@ -48,6 +48,12 @@ export const AuthProvider = ({ children }) => {
   };
 
   const logout = () => {
+    // Revoke the token server-side too; the local session ends regardless
+    if (token) {
+      axios.post(`${API}/auth/logout`, {}, {
+        headers: { Authorization: `Bearer ${token}` }
+      }).catch(() => {});
+    }
     localStorage.removeItem('token');
     setToken(null);
     setUser(null);
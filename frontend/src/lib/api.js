@@ -0,0 +1,18 @@
+import axios from 'axios';
+
+const PAGE_SIZE = 200;
+
+// List endpoints return { items, next_cursor }; follow the cursor until the
+// whole collection is loaded (admin tables and category filters need it all)
+export async function fetchAllPages(url, params = {}) {
+  const items = [];
+  let cursor = null;
+  do {
+    const response = await axios.get(url, {
+      params: { ...params, limit: PAGE_SIZE, ...(cursor ? { cursor } : {}) }
+    });
+    items.push(...response.data.items);
+    cursor = response.data.next_cursor;
+  } while (cursor);
+  return items;
+}
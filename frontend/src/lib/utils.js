@@ -4,3 +4,13 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+const BACKEND_URL = process.env.REACT_APP_BACKEND_URL || "";
+
+// Uploaded images are stored as "/api/images/<hash>" paths on the backend
+export function resolveImageUrl(url) {
+  if (url && url.startsWith("/api/")) {
+    return `${BACKEND_URL}${url}`;
+  }
+  return url;
+}
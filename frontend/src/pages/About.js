@@ -4,6 +4,7 @@ import { Heart, Award, Clock, Sparkles, Instagram } from 'lucide-react';
 import axios from 'axios';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
+import { resolveImageUrl } from '@/lib/utils';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 const INSTAGRAM_PROFILE_URL = "https://instagram.com/paula.veigacakes";
@@ -24,7 +25,7 @@ const About = () => {
     fetchSettings();
   }, []);
 
-  const logoUrl = settings.logo_url || DEFAULT_LOGO;
+  const logoUrl = resolveImageUrl(settings.logo_url) || DEFAULT_LOGO;
 
   const values = [
     {
@@ -15,8 +15,11 @@ import { Select, SelectContent, SelectItem, SelectTrigger, SelectValue } from '@
 import { Dialog, DialogContent, DialogHeader, DialogTitle, DialogTrigger } from '@/components/ui/dialog';
 import { Table, TableBody, TableCell, TableHead, TableHeader, TableRow } from '@/components/ui/table';
 import { Switch } from '@/components/ui/switch';
+import { Checkbox } from '@/components/ui/checkbox';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Alert, AlertDescription } from '@/components/ui/alert';
+import { resolveImageUrl } from '@/lib/utils';
+import { fetchAllPages } from '@/lib/api';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -169,6 +172,7 @@ const CakesPage = () => {
   const [loading, setLoading] = useState(true);
   const [dialogOpen, setDialogOpen] = useState(false);
   const [editingCake, setEditingCake] = useState(null);
+  const [selectedIds, setSelectedIds] = useState([]);
   const [formData, setFormData] = useState({
     name: '', description: '', price: '', category_id: '', image_url: '', featured: false
   });
@@ -176,12 +180,13 @@ const CakesPage = () => {
 
   const fetchData = async () => {
     try {
-      const [cakesRes, categoriesRes] = await Promise.all([
-        axios.get(`${API}/cakes`),
-        axios.get(`${API}/categories`)
+      const [cakesList, categoriesList] = await Promise.all([
+        fetchAllPages(`${API}/cakes`),
+        fetchAllPages(`${API}/categories`)
       ]);
-      setCakes(cakesRes.data);
-      setCategories(categoriesRes.data);
+      setCakes(cakesList);
+      setCategories(categoriesList);
+      setSelectedIds([]);
     } catch (error) {
       toast.error('Erro ao carregar dados');
     } finally {
@@ -253,6 +258,28 @@ const CakesPage = () => {
     }
   };
 
+  const toggleSelected = (id, checked) => {
+    setSelectedIds((current) => checked ? [...current, id] : current.filter((selectedId) => selectedId !== id));
+  };
+
+  // Applies one operation to every selected cake in a single request
+  const handleBulk = async (operation, message) => {
+    if (operation.op === 'delete' && !window.confirm(`Tem certeza que deseja excluir ${selectedIds.length} bolos?`)) return;
+    try {
+      const operations = selectedIds.map((id) => ({ ...operation, id }));
+      const response = await axios.post(`${API}/cakes/bulk`, { operations }, { headers: getAuthHeaders() });
+      const failed = response.data.results.filter((result) => result.status !== 'ok').length;
+      if (failed) {
+        toast.error(`${failed} bolos não puderam ser alterados`);
+      } else {
+        toast.success(message);
+      }
+      fetchData();
+    } catch (error) {
+      toast.error('Erro ao alterar bolos');
+    }
+  };
+
   const getCategoryName = (id) => categories.find(c => c.id === id)?.name || '';
 
   return (
@@ -330,7 +357,7 @@ const CakesPage = () => {
                 <Label className="font-body">Imagem</Label>
                 <div className="mt-2 flex items-center gap-4">
                   {formData.image_url && (
-                    <img src={formData.image_url} alt="Preview" className="w-20 h-20 object-cover rounded-lg" />
+                    <img src={resolveImageUrl(formData.image_url)} alt="Preview" className="w-20 h-20 object-cover rounded-lg" />
                   )}
                   <label className="flex items-center gap-2 px-4 py-2 bg-paula-pink-light rounded-lg cursor-pointer hover:bg-paula-pink-medium transition-colors">
                     <Upload size={18} />
@@ -367,10 +394,32 @@ const CakesPage = () => {
           <div className="animate-spin rounded-full h-8 w-8 border-b-2 border-paula-accent" />
         </div>
       ) : (
+        <>
+        {selectedIds.length > 0 && (
+          <div className="flex items-center gap-2 mb-4" data-testid="bulk-actions">
+            <span className="font-body text-sm text-gray-600 mr-2">{selectedIds.length} selecionados</span>
+            <Button variant="outline" size="sm" onClick={() => handleBulk({ op: 'update', data: { featured: true } }, 'Bolos destacados!')} data-testid="bulk-feature-btn">
+              <Star size={16} className="mr-2" /> Destacar
+            </Button>
+            <Button variant="outline" size="sm" onClick={() => handleBulk({ op: 'update', data: { featured: false } }, 'Destaques removidos!')} data-testid="bulk-unfeature-btn">
+              Remover destaque
+            </Button>
+            <Button variant="outline" size="sm" className="text-red-500" onClick={() => handleBulk({ op: 'delete' }, 'Bolos removidos!')} data-testid="bulk-delete-btn">
+              <Trash2 size={16} className="mr-2" /> Excluir selecionados
+            </Button>
+          </div>
+        )}
         <div className="bg-white rounded-xl border border-pink-100 overflow-hidden">
           <Table>
             <TableHeader>
               <TableRow>
+                <TableHead className="w-10">
+                  <Checkbox
+                    checked={cakes.length > 0 && selectedIds.length === cakes.length}
+                    onCheckedChange={(checked) => setSelectedIds(checked ? cakes.map((cake) => cake.id) : [])}
+                    data-testid="select-all-cakes"
+                  />
+                </TableHead>
                 <TableHead className="font-body">Imagem</TableHead>
                 <TableHead className="font-body">Nome</TableHead>
                 <TableHead className="font-body">Categoria</TableHead>
@@ -383,7 +432,14 @@ const CakesPage = () => {
               {cakes.map((cake) => (
                 <TableRow key={cake.id}>
                   <TableCell>
-                    <img src={cake.image_url} alt={cake.name} className="w-12 h-12 object-cover rounded-lg" />
+                    <Checkbox
+                      checked={selectedIds.includes(cake.id)}
+                      onCheckedChange={(checked) => toggleSelected(cake.id, checked)}
+                      data-testid={`select-cake-${cake.id}`}
+                    />
+                  </TableCell>
+                  <TableCell>
+                    <img src={resolveImageUrl(cake.images?.thumbnail?.jpeg || cake.image_url)} alt={cake.name} className="w-12 h-12 object-cover rounded-lg" />
                   </TableCell>
                   <TableCell className="font-body font-medium">{cake.name}</TableCell>
                   <TableCell className="font-body">{getCategoryName(cake.category_id)}</TableCell>
@@ -408,6 +464,7 @@ const CakesPage = () => {
             </TableBody>
           </Table>
         </div>
+        </>
       )}
     </div>
   );
@@ -423,8 +480,7 @@ const CategoriesPage = () => {
 
   const fetchData = async () => {
     try {
-      const response = await axios.get(`${API}/categories`);
-      setCategories(response.data);
+      setCategories(await fetchAllPages(`${API}/categories`));
     } catch (error) {
       toast.error('Erro ao carregar categorias');
     } finally {
@@ -553,8 +609,7 @@ const TestimonialsPage = () => {
 
   const fetchData = async () => {
     try {
-      const response = await axios.get(`${API}/testimonials`);
-      setTestimonials(response.data);
+      setTestimonials(await fetchAllPages(`${API}/testimonials`));
     } catch (error) {
       toast.error('Erro ao carregar depoimentos');
     } finally {
@@ -727,7 +782,18 @@ const SettingsPage = () => {
     setSyncing(true);
     try {
       const response = await axios.post(`${API}/instagram/sync`, {}, { headers: getAuthHeaders() });
-      toast.success(response.data.message);
+      // The sync runs as a background job; poll until it finishes
+      let job = { status: response.data.status };
+      while (job.status === 'pending' || job.status === 'running') {
+        await new Promise((resolve) => setTimeout(resolve, 2000));
+        const jobRes = await axios.get(`${API}/jobs/${response.data.job_id}`, { headers: getAuthHeaders() });
+        job = jobRes.data;
+      }
+      if (job.status === 'succeeded') {
+        toast.success(`${job.result.imported} fotos importadas do Instagram com sucesso!`);
+      } else {
+        toast.error(job.error || 'Erro ao sincronizar com Instagram');
+      }
     } catch (error) {
       toast.error(error.response?.data?.detail || 'Erro ao sincronizar com Instagram');
     } finally {
@@ -760,7 +826,7 @@ const SettingsPage = () => {
             </p>
             <div className="flex gap-4 items-start">
               {settings.logo_url && (
-                <img src={settings.logo_url} alt="Logo preview" className="w-20 h-20 object-cover rounded-full border-2 border-pink-200" />
+                <img src={resolveImageUrl(settings.logo_url)} alt="Logo preview" className="w-20 h-20 object-cover rounded-full border-2 border-pink-200" />
               )}
               <Input
                 value={settings.logo_url}
@@ -779,7 +845,7 @@ const SettingsPage = () => {
             </p>
             <div className="flex gap-4 items-start">
               {settings.hero_image_url && (
-                <img src={settings.hero_image_url} alt="Hero preview" className="w-20 h-20 object-cover rounded-lg border border-pink-200" />
+                <img src={resolveImageUrl(settings.hero_image_url)} alt="Hero preview" className="w-20 h-20 object-cover rounded-lg border border-pink-200" />
               )}
               <Input
                 value={settings.hero_image_url}
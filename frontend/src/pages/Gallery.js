@@ -1,46 +1,99 @@
-import React, { useEffect, useState } from 'react';
+import React, { useEffect, useRef, useState } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
-import { X, Filter } from 'lucide-react';
+import { X, Filter, Search } from 'lucide-react';
 import axios from 'axios';
 import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import CakeCard from '@/components/CakeCard';
+import { resolveImageUrl } from '@/lib/utils';
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '@/components/ui/dialog';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
+const PAGE_SIZE = 24;
+const SEARCH_DELAY_MS = 300;
+const SORT_OPTIONS = [
+  { value: 'newest', label: 'Mais recentes' },
+  { value: 'price_asc', label: 'Menor preço' },
+  { value: 'price_desc', label: 'Maior preço' },
+];
 
 const Gallery = () => {
   const [cakes, setCakes] = useState([]);
   const [categories, setCategories] = useState([]);
   const [selectedCategory, setSelectedCategory] = useState('all');
+  const [categoryCounts, setCategoryCounts] = useState({});
+  const [sort, setSort] = useState('newest');
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [nextCursor, setNextCursor] = useState(null);
   const [selectedCake, setSelectedCake] = useState(null);
+  const [searchInput, setSearchInput] = useState('');
+  const [query, setQuery] = useState('');
+  const categoriesLoaded = useRef(false);
 
+  // Search once the visitor stops typing
   useEffect(() => {
-    const fetchData = async () => {
-      try {
-        const [cakesRes, categoriesRes] = await Promise.all([
-          axios.get(`${API}/cakes`),
-          axios.get(`${API}/categories`)
-        ]);
-        setCakes(cakesRes.data);
-        setCategories(categoriesRes.data);
-      } catch (error) {
-        console.error('Error fetching data:', error);
-      } finally {
-        setLoading(false);
-      }
-    };
-    fetchData();
-  }, []);
+    const timer = setTimeout(() => setQuery(searchInput.trim()), SEARCH_DELAY_MS);
+    return () => clearTimeout(timer);
+  }, [searchInput]);
 
-  const filteredCakes = selectedCategory === 'all'
-    ? cakes
-    : cakes.filter(cake => cake.category_id === selectedCategory);
+  const fetchCakes = (cursor = null) => {
+    const params = { limit: PAGE_SIZE };
+    if (selectedCategory !== 'all') params.category_id = selectedCategory;
+    if (cursor) params.cursor = cursor;
+    if (query.length >= 2) {
+      // Search results are ordered by relevance
+      return axios.get(`${API}/cakes/search`, { params: { ...params, q: query } });
+    }
+    return axios.get(`${API}/cakes`, { params: { ...params, sort } });
+  };
 
-  const getCategoryName = (categoryId) => {
-    const category = categories.find(c => c.id === categoryId);
-    return category ? category.name : '';
+  // The first load gets categories and the first page of cakes in one round
+  // trip; after that, filtering happens on the server, one page at a time
+  const fetchFirstPage = () => {
+    if (categoriesLoaded.current) {
+      return fetchCakes().then((response) => response.data);
+    }
+    const params = { limit: PAGE_SIZE, sort };
+    if (selectedCategory !== 'all') params.category_id = selectedCategory;
+    return axios.get(`${API}/gallery`, { params }).then((response) => {
+      categoriesLoaded.current = true;
+      setCategories(response.data.categories);
+      const counts = {};
+      (response.data.cakes.facets?.categories || []).forEach((facet) => {
+        counts[facet.category_id] = facet.count;
+      });
+      setCategoryCounts(counts);
+      return response.data.cakes;
+    });
+  };
+
+  useEffect(() => {
+    let cancelled = false;
+    setLoading(true);
+    fetchFirstPage()
+      .then((page) => {
+        if (cancelled) return;
+        setCakes(page.items);
+        setNextCursor(page.next_cursor);
+      })
+      .catch((error) => console.error('Error fetching data:', error))
+      .finally(() => !cancelled && setLoading(false));
+    return () => { cancelled = true; };
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [selectedCategory, query, sort]);
+
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const response = await fetchCakes(nextCursor);
+      setCakes((current) => [...current, ...response.data.items]);
+      setNextCursor(response.data.next_cursor);
+    } catch (error) {
+      console.error('Error fetching data:', error);
+    } finally {
+      setLoadingMore(false);
+    }
   };
 
   return (
@@ -100,8 +153,33 @@ const Gallery = () => {
                 data-testid={`filter-${category.slug}`}
               >
                 {category.name}
+                {categoryCounts[category.id] !== undefined && (
+                  <span className="ml-2 text-xs opacity-70">{categoryCounts[category.id]}</span>
+                )}
               </motion.button>
             ))}
+            <select
+              value={sort}
+              onChange={(e) => setSort(e.target.value)}
+              disabled={query.length >= 2}
+              className="ml-auto flex-shrink-0 px-4 py-2 rounded-full bg-paula-cream text-paula-brown-dark font-body focus:outline-none focus:ring-2 focus:ring-paula-brown/30 disabled:opacity-60"
+              data-testid="gallery-sort"
+            >
+              {SORT_OPTIONS.map((option) => (
+                <option key={option.value} value={option.value}>{option.label}</option>
+              ))}
+            </select>
+            <div className="relative flex-shrink-0">
+              <Search size={18} className="absolute left-3 top-1/2 -translate-y-1/2 text-paula-brown/60" />
+              <input
+                type="search"
+                value={searchInput}
+                onChange={(e) => setSearchInput(e.target.value)}
+                placeholder="Buscar bolos..."
+                className="pl-10 pr-4 py-2 rounded-full bg-paula-cream text-paula-brown-dark font-body placeholder:text-paula-brown/60 focus:outline-none focus:ring-2 focus:ring-paula-brown/30 w-56"
+                data-testid="gallery-search"
+              />
+            </div>
           </div>
         </div>
       </section>
@@ -113,10 +191,10 @@ const Gallery = () => {
             <div className="flex justify-center py-20">
               <div className="animate-spin rounded-full h-12 w-12 border-b-2 border-paula-brown-dark"></div>
             </div>
-          ) : filteredCakes.length === 0 ? (
+          ) : cakes.length === 0 ? (
             <div className="text-center py-20">
               <p className="text-paula-brown font-body text-lg">
-                Nenhum bolo encontrado nesta categoria.
+                {query.length >= 2 ? 'Nenhum bolo encontrado para esta busca.' : 'Nenhum bolo encontrado nesta categoria.'}
               </p>
             </div>
           ) : (
@@ -125,7 +203,7 @@ const Gallery = () => {
               className="grid grid-cols-1 sm:grid-cols-2 lg:grid-cols-3 xl:grid-cols-4 gap-8"
             >
               <AnimatePresence mode="popLayout">
-                {filteredCakes.map((cake, index) => (
+                {cakes.map((cake, index) => (
                   <motion.div
                     key={cake.id}
                     layout
@@ -140,6 +218,20 @@ const Gallery = () => {
               </AnimatePresence>
             </motion.div>
           )}
+          {!loading && nextCursor && (
+            <div className="flex justify-center mt-12">
+              <motion.button
+                whileHover={{ scale: 1.05 }}
+                whileTap={{ scale: 0.95 }}
+                onClick={loadMore}
+                disabled={loadingMore}
+                className="px-8 py-3 rounded-full font-body font-medium bg-paula-cream text-paula-brown-dark hover:bg-paula-cream-dark transition-colors disabled:opacity-60"
+                data-testid="gallery-load-more"
+              >
+                {loadingMore ? 'Carregando...' : 'Ver mais'}
+              </motion.button>
+            </div>
+          )}
         </div>
       </section>
 
@@ -149,11 +241,16 @@ const Gallery = () => {
           {selectedCake && (
             <div className="grid md:grid-cols-2">
               <div className="aspect-square">
-                <img
-                  src={selectedCake.image_url}
-                  alt={selectedCake.name}
-                  className="w-full h-full object-cover"
-                />
+                <picture>
+                  {selectedCake.images?.full && (
+                    <source srcSet={resolveImageUrl(selectedCake.images.full.webp)} type="image/webp" />
+                  )}
+                  <img
+                    src={resolveImageUrl(selectedCake.images?.full?.jpeg || selectedCake.image_url)}
+                    alt={selectedCake.name}
+                    className="w-full h-full object-cover"
+                  />
+                </picture>
               </div>
               <div className="p-8 flex flex-col">
                 <DialogHeader>
@@ -163,7 +260,7 @@ const Gallery = () => {
                 </DialogHeader>
                 <div className="mt-2 mb-4">
                   <span className="inline-block bg-paula-cream text-paula-brown px-3 py-1 rounded-full text-sm font-body">
-                    {getCategoryName(selectedCake.category_id)}
+                    {selectedCake.category_name}
                   </span>
                 </div>
                 <p className="text-paula-brown font-body flex-grow">
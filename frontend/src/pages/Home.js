@@ -7,6 +7,7 @@ import Navbar from '@/components/Navbar';
 import Footer from '@/components/Footer';
 import CakeCard from '@/components/CakeCard';
 import TestimonialCard from '@/components/TestimonialCard';
+import { resolveImageUrl } from '@/lib/utils';
 
 const API = `${process.env.REACT_APP_BACKEND_URL}/api`;
 
@@ -22,14 +23,11 @@ const Home = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [cakesRes, testimonialsRes, settingsRes] = await Promise.all([
-          axios.get(`${API}/cakes?featured=true`),
-          axios.get(`${API}/testimonials`),
-          axios.get(`${API}/settings`).catch(() => ({ data: {} }))
-        ]);
-        setFeaturedCakes(cakesRes.data.slice(0, 4));
-        setTestimonials(testimonialsRes.data);
-        setSettings(settingsRes.data || {});
+        // Featured cakes, testimonials and settings in one round trip
+        const { data } = await axios.get(`${API}/home`);
+        setFeaturedCakes(data.featured_cakes);
+        setTestimonials(data.testimonials);
+        setSettings(data.settings || {});
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
@@ -39,7 +37,7 @@ const Home = () => {
     fetchData();
   }, []);
 
-  const heroImage = settings.hero_image_url || DEFAULT_HERO_IMAGE;
+  const heroImage = resolveImageUrl(settings.hero_image_url) || DEFAULT_HERO_IMAGE;
 
   const containerVariants = {
     hidden: { opacity: 0 },
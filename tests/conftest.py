@@ -0,0 +1,67 @@
+"""
+Shared fixtures. The API runs against an in-memory mongomock database,
+so the suite needs neither a MongoDB server nor network access:
+
+    python -m pytest tests
+"""
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+# Settings are read when server is imported
+BLOB_DIR = tempfile.mkdtemp(prefix="paula-veiga-tests-")
+os.environ["BLOB_BACKEND"] = "local"
+os.environ["BLOB_STORAGE_PATH"] = BLOB_DIR
+# One process: no other workers to hear from
+os.environ["CACHE_SYNC_INTERVAL"] = "0"
+
+import indexes  # noqa: E402
+import server  # noqa: E402
+from benchmarks.catalogue import mongomock_indexes  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+ADMIN_EMAIL = "admin@paulaveiga.com"
+ADMIN_PASSWORD = "senha123"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def blob_dir():
+    yield BLOB_DIR
+    shutil.rmtree(BLOB_DIR, ignore_errors=True)
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient(tz_aware=True)["paula_veiga_doces_test"]
+
+
+@pytest.fixture
+def client(monkeypatch, db):
+    monkeypatch.setattr(server, "client", db.client)
+    monkeypatch.setattr(server, "db", db)
+    for collection, models in list(indexes.INDEXES.items()):
+        monkeypatch.setitem(indexes.INDEXES, collection, mongomock_indexes(models))
+    server.response_cache.clear()
+    server.principal_cache.clear()
+    # The startup hook creates the default admin
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    response = client.post("/api/auth/login", json={"email": ADMIN_EMAIL, "password": ADMIN_PASSWORD})
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
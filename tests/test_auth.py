@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+import server
+from cache import ResponseCache
+from tests.conftest import ADMIN_PASSWORD
+
+
+def test_logout_revokes_the_token(client, auth_headers):
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+    assert client.post("/api/auth/logout", headers=auth_headers).status_code == 200
+
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token revogado"
+
+
+def test_password_change_revokes_other_tokens(client, auth_headers):
+    response = client.put("/api/auth/password", headers=auth_headers, json={
+        "current_password": ADMIN_PASSWORD, "new_password": "outra-senha-123",
+    })
+    assert response.status_code == 200, response.text
+
+    old = client.get("/api/auth/me", headers=auth_headers)
+    assert old.status_code == 401 and old.json()["detail"] == "Token revogado"
+    fresh = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    assert client.get("/api/auth/me", headers=fresh).status_code == 200
+
+
+def test_revocation_from_another_worker(client, auth_headers):
+    # Cached by this worker
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+    # Another worker handles the logout: only the database changes here...
+    client.portal.call(server.db.admins.update_many, {}, {"$inc": {"token_version": 1}})
+    assert client.get("/api/auth/me", headers=auth_headers).status_code == 200
+    # ...until its invalidation arrives
+    server.apply_remote_changes(["admins"])
+    response = client.get("/api/auth/me", headers=auth_headers)
+    assert response.status_code == 401 and response.json()["detail"] == "Token revogado"
+
+
+@pytest.mark.anyio
+async def test_principal_forgotten_while_loading_is_not_cached():
+    cache = ResponseCache()
+    reading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load():
+        reading.set()
+        await release.wait()
+        return {"id": "user-1", "token_version": 0}
+
+    pending = asyncio.create_task(cache.get_or_load("admins", "user-1", load))
+    await reading.wait()
+    cache.delete("admins", "user-1")
+    release.set()
+    await pending
+    assert cache.get("admins", "user-1") is None
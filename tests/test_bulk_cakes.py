@@ -0,0 +1,50 @@
+def cake(name, **fields):
+    return {
+        "name": name, "description": "Bolo de teste", "price": 80, "category_id": "cat-aniversario",
+        "image_url": "https://cdn.example.com/bolo.jpg", **fields,
+    }
+
+
+def test_bulk_cakes_reports_each_operation(client, auth_headers):
+    created = client.post("/api/cakes", headers=auth_headers, json=cake("Existente")).json()
+    doomed = client.post("/api/cakes", headers=auth_headers, json=cake("Removido")).json()
+    untouched = client.post("/api/cakes", headers=auth_headers, json=cake("Intocado")).json()
+    listed = client.get("/api/cakes").json()["items"]
+    assert len(listed) == 3
+
+    response = client.post("/api/cakes/bulk", headers=auth_headers, json={"operations": [
+        {"op": "create", "data": cake("Novo")},
+        {"op": "create", "data": {"description": "sem nome"}},
+        {"op": "update", "id": created["id"], "data": {"price": 150}},
+        {"op": "update", "id": created["id"], "data": {"price": 1}},
+        {"op": "update", "id": "nao-existe", "data": {"price": 1}},
+        {"op": "update", "id": untouched["id"], "data": {}},
+        {"op": "delete", "id": doomed["id"]},
+        {"op": "delete"},
+    ]})
+    assert response.status_code == 200, response.text
+    body = response.json()
+    statuses = [(result["index"], result["op"], result["status"]) for result in body["results"]]
+    assert statuses == [
+        (0, "create", "ok"),
+        (1, "create", "error"),
+        (2, "update", "ok"),
+        # Same cake twice in one unordered batch
+        (3, "update", "error"),
+        (4, "update", "not_found"),
+        (5, "update", "error"),
+        (6, "delete", "ok"),
+        (7, "delete", "error"),
+    ]
+    assert all(result["error"] for result in body["results"] if result["status"] == "error")
+    assert (body["created"], body["updated"], body["deleted"]) == (1, 1, 1)
+
+    # Only the valid operations were applied, and the cached list shows them
+    cakes = {item["id"]: item for item in client.get("/api/cakes").json()["items"]}
+    assert set(cakes) == {created["id"], untouched["id"], body["results"][0]["id"]}
+    assert cakes[created["id"]]["price"] == 150
+
+
+def test_bulk_cakes_requires_admin(client):
+    response = client.post("/api/cakes/bulk", json={"operations": [{"op": "delete", "id": "x"}]})
+    assert response.status_code in (401, 403)
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+import server
+from cache import ResponseCache
+
+
+@pytest.mark.anyio
+async def test_invalidate_drops_entries_of_the_namespace_only():
+    cache = ResponseCache()
+    cache.set("cakes", "list", [1])
+    cache.set("categories", "list", [2])
+    cache.invalidate("cakes")
+    assert cache.get("cakes", "list") is None
+    assert cache.get("categories", "list") == [2]
+
+
+@pytest.mark.anyio
+async def test_load_in_flight_during_a_write_is_not_kept():
+    cache = ResponseCache()
+    reading = asyncio.Event()
+    release = asyncio.Event()
+
+    async def load():
+        reading.set()
+        await release.wait()
+        return ["stale"]
+
+    pending = asyncio.create_task(cache.get_or_load("cakes", "list", load))
+    await reading.wait()
+    cache.invalidate("cakes")
+    release.set()
+    # The caller still gets what was read, but the next one reloads
+    assert await pending == ["stale"]
+    assert cache.get("cakes", "list") is None
+
+
+@pytest.mark.anyio
+async def test_concurrent_misses_load_once():
+    cache = ResponseCache()
+    calls = 0
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0)
+        return "value"
+
+    results = await asyncio.gather(*(cache.get_or_load("cakes", "list", load) for _ in range(5)))
+    assert results == ["value"] * 5 and calls == 1
+
+
+def test_writes_invalidate_cached_lists(client, auth_headers):
+    client.post("/api/seed")
+    before = client.get("/api/cakes", params={"limit": 50}).json()["items"]
+    gallery = client.get("/api/gallery").json()
+    response = client.post("/api/cakes", headers=auth_headers, json={
+        "name": "Bolo novo", "description": "Recém-saído do forno", "price": 120,
+        "category_id": "cat-aniversario", "image_url": "https://cdn.example.com/bolo.jpg",
+    })
+    assert response.status_code == 200, response.text
+
+    after = client.get("/api/cakes", params={"limit": 50}).json()["items"]
+    assert len(after) == len(before) + 1
+    # Bundles built from cakes go stale with them
+    newest = client.get("/api/gallery").json()["cakes"]["items"][0]
+    assert newest["id"] == response.json()["id"] != gallery["cakes"]["items"][0]["id"]
+    assert server.response_cache.invalidations > 0
@@ -0,0 +1,46 @@
+import gzip
+
+import brotli
+import pytest
+
+import server
+from compression import negotiate
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    (None, None),
+    ("", None),
+    ("identity", None),
+    ("gzip", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip;q=1", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("*;q=0", None),
+    ("gzip;q=abc", None),
+])
+def test_negotiate(accept_encoding, expected):
+    assert negotiate(accept_encoding, ("br", "gzip")) == expected
+
+
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_accept_encoding_negotiation(client, monkeypatch, fast_json):
+    monkeypatch.setattr(server.app_settings, "FAST_JSON", fast_json)
+    client.post("/api/seed")
+    plain = client.get("/api/cakes", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    for encoding, decompress in (("gzip", gzip.decompress), ("br", brotli.decompress)):
+        # httpx would decode the body itself: read the raw bytes
+        with client.stream("GET", "/api/cakes", headers={"Accept-Encoding": encoding}) as response:
+            raw = b"".join(response.iter_raw())
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert int(response.headers["content-length"]) == len(raw)
+        assert decompress(raw) == plain.content
+
+    preferred = client.get("/api/cakes", headers={"Accept-Encoding": "br;q=0.5, gzip"})
+    assert preferred.headers["content-encoding"] == "gzip"
+    # Below COMPRESSION_MIN_SIZE responses go out as they are
+    small = client.get("/api/categories?limit=1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
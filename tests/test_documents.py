@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+import server
+from documents import migrate_dates
+
+
+def cake(n, created_at):
+    return {
+        "id": f"cake-{n:02d}", "name": f"Bolo {n}", "description": "Bolo de teste", "price": 80,
+        "category_id": "cat-aniversario", "image_url": "https://cdn.example.com/bolo.jpg",
+        "featured": False, "created_at": created_at,
+    }
+
+
+def mixed_catalogue():
+    start = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+    cakes = []
+    for n in range(12):
+        created_at = start + timedelta(hours=n, milliseconds=n * 7)
+        if n % 3 == 0:
+            # Written by an older version of the API
+            created_at = created_at.isoformat(timespec="milliseconds")
+        elif n % 3 == 1:
+            # Older still: naive, meaning UTC
+            created_at = created_at.replace(tzinfo=None).isoformat()
+        cakes.append(cake(n, created_at))
+    return cakes
+
+
+@pytest.mark.anyio
+async def test_migrate_dates_converts_iso_strings(db):
+    await db.cakes.insert_many(mixed_catalogue())
+    await db.settings.insert_one({"id": "site_settings", "updated_at": "2024-05-01T12:00:00+00:00",
+                                  "instagram_last_media_at": "não é data"})
+
+    assert (await migrate_dates(db, dry_run=True))["cakes"] == 8
+    assert await db.cakes.count_documents({"created_at": {"$type": "string"}}) == 8
+
+    converted = await migrate_dates(db)
+    assert converted["cakes"] == 8 and converted["settings"] == 1
+    assert await db.cakes.count_documents({"created_at": {"$type": "string"}}) == 0
+    first = await db.cakes.find_one({"id": "cake-01"})
+    assert first["created_at"] == datetime(2024, 5, 1, 13, 0, 0, 7000, tzinfo=timezone.utc)
+    # Unparseable values are left for a human to look at
+    settings = await db.settings.find_one({"id": "site_settings"})
+    assert settings["instagram_last_media_at"] == "não é data"
+    assert isinstance(settings["updated_at"], datetime)
+
+    assert (await migrate_dates(db))["cakes"] == 0
+
+
+def test_pagination_after_migration_visits_old_and_new_cakes(client):
+    async def seed():
+        await server.db.cakes.insert_many(mixed_catalogue())
+        await migrate_dates(server.db)
+    client.portal.call(seed)
+    server.mark_changed("cakes")
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 5, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/cakes", params=params).json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    # Newest first, every cake exactly once
+    assert seen == [f"cake-{n:02d}" for n in reversed(range(12))]
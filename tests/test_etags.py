@@ -0,0 +1,27 @@
+def test_etag_and_not_modified(client, auth_headers):
+    client.post("/api/seed")
+    response = client.get("/api/cakes")
+    etag = response.headers["etag"]
+    # One tag for the gzip, brotli and identity bodies: a weak one
+    assert etag.startswith('W/"')
+    assert response.headers["cache-control"] == "no-cache"
+
+    not_modified = client.get("/api/cakes", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert "Accept-Encoding" in not_modified.headers["vary"]
+    # Weak comparison: a strong form of the same tag matches too
+    assert client.get("/api/cakes", headers={"If-None-Match": etag[2:]}).status_code == 304
+    # The query is part of the tag
+    assert client.get("/api/cakes?limit=2", headers={"If-None-Match": etag}).status_code == 200
+
+    last_modified = response.headers["last-modified"]
+    assert client.get("/api/cakes", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+    client.post("/api/testimonials", headers=auth_headers, json={"author_name": "Ana", "content": "Ótimo"})
+    # Another collection's write leaves the tag alone; a cake write changes it
+    assert client.get("/api/cakes", headers={"If-None-Match": etag}).status_code == 304
+    cake_id = response.json()["items"][0]["id"]
+    client.put(f"/api/cakes/{cake_id}", headers=auth_headers, json={"price": 99})
+    changed = client.get("/api/cakes", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
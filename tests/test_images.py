@@ -0,0 +1,25 @@
+import io
+
+from PIL import Image
+
+import server
+
+
+def png_bytes(size) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (30, 120, 200)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_reupload_does_not_render_variants_again(client, auth_headers, monkeypatch):
+    png = png_bytes((64, 48))
+    first = client.post("/api/upload", headers=auth_headers, files={"file": ("bolo.png", png, "image/png")})
+    client.portal.call(server.image_pipeline.drain)
+    assert client.get(first.json()["images"]["card"]["jpeg"]).headers["content-type"] == "image/jpeg"
+
+    rendered = []
+    monkeypatch.setattr(server.image_pipeline, "start", lambda: rendered.append(True))
+    again = client.post("/api/upload", headers=auth_headers, files={"file": ("bolo.png", png, "image/png")})
+    client.portal.call(server.image_pipeline.drain)
+    assert again.json()["hash"] == first.json()["hash"]
+    assert rendered == []
@@ -0,0 +1,94 @@
+import httpx
+import pytest
+
+from instagram import InstagramClient, InstagramError, import_media, parse_timestamp
+
+USER_ID = "17841400000000000"
+TOKEN = "token-de-teste"
+
+
+def media(n, media_type="IMAGE", timestamp="2024-05-01T18:10:00+0000"):
+    return {
+        "id": str(n),
+        "caption": f"Bolo {n}",
+        "media_type": media_type,
+        "media_url": f"https://cdn.example.com/{n}.jpg",
+        "permalink": f"https://www.instagram.com/p/{n}/",
+        "timestamp": timestamp,
+    }
+
+
+def graph_api(pages, requests=None, failures=0):
+    """A Graph API stand-in serving pages of media, linked through paging.next."""
+    state = {"failures": failures}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        if state["failures"]:
+            state["failures"] -= 1
+            return httpx.Response(503)
+        if request.url.params.get("access_token") != TOKEN:
+            return httpx.Response(400, json={"error": {"message": "Invalid OAuth access token"}})
+        page = int(request.url.params.get("page", "0"))
+        body = {"data": pages[page]}
+        if page + 1 < len(pages):
+            body["paging"] = {"next": f"https://graph.test/{USER_ID}/media?access_token={TOKEN}&page={page + 1}"}
+        return httpx.Response(200, json=body)
+
+    return InstagramClient(base_url="https://graph.test", backoff=0, transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.anyio
+async def test_import_media_across_pages(db):
+    await db.categories.insert_one({"id": "cat-aniversario", "name": "Aniversário"})
+    await db.cakes.insert_one({"id": "old", "instagram_url": "https://www.instagram.com/p/2/"})
+    pages = [
+        [media(1), media(2), media(3, media_type="VIDEO")],
+        [media(4, media_type="CAROUSEL_ALBUM"), media(5)],
+    ]
+    requests, progress = [], []
+
+    async def on_progress(counts):
+        # Reported counts are already in the database
+        assert await db.cakes.count_documents({"instagram_url": {"$exists": True}}) == 1 + counts["imported"]
+        progress.append(counts)
+
+    client = graph_api(pages, requests)
+    counts = await import_media(db, client, USER_ID, TOKEN, on_progress=on_progress)
+    await client.aclose()
+
+    assert len(requests) == 2
+    assert [p["imported"] for p in progress] == [1, 3]
+    # Post 2 was already imported, the video can't be
+    assert counts["fetched"] == 5 and counts["imported"] == 3 and counts["skipped"] == 2
+    cakes = await db.cakes.find({"id": {"$ne": "old"}}, {"_id": 0}).to_list(None)
+    assert {cake["instagram_url"] for cake in cakes} == {f"https://www.instagram.com/p/{n}/" for n in (1, 4, 5)}
+    assert all(cake["category_id"] == "cat-aniversario" for cake in cakes)
+
+
+@pytest.mark.anyio
+async def test_import_media_stops_at_known_posts(db):
+    pages = [
+        [media(3, timestamp="2024-05-03T10:00:00+0000"), media(2, timestamp="2024-05-02T10:00:00+0000")],
+        [media(1, timestamp="2024-05-01T10:00:00+0000")],
+    ]
+    requests = []
+    client = graph_api(pages, requests)
+    counts = await import_media(db, client, USER_ID, TOKEN, since=parse_timestamp("2024-05-02T10:00:00+0000"))
+    await client.aclose()
+
+    assert len(requests) == 1
+    assert counts["imported"] == 1
+    assert counts["latest_timestamp"] == parse_timestamp("2024-05-03T10:00:00+0000")
+
+
+@pytest.mark.anyio
+async def test_graph_api_errors(db):
+    client = graph_api([[media(1)]], failures=1)
+    counts = await import_media(db, client, USER_ID, TOKEN)
+    assert counts["imported"] == 1
+
+    with pytest.raises(InstagramError, match="Invalid OAuth access token"):
+        await import_media(db, client, USER_ID, "expirado")
+    await client.aclose()
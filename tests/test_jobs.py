@@ -0,0 +1,113 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+
+import server
+from documents import utcnow
+from jobs import JOB_FAILED, JOB_MAX_ATTEMPTS, JOB_PENDING, JOB_RUNNING, JOB_SUCCEEDED, JobRunner
+
+LEASE = 60
+
+
+async def exclusive_jobs(db):
+    # Stands in for the partial unique index active_kind_unique, which mongomock can't build
+    await db.jobs.create_index("active_kind", unique=True, sparse=True)
+
+
+async def idle(job, report_progress):
+    return {}
+
+
+def runner_for(db, **handlers) -> JobRunner:
+    runner = JobRunner(poll_interval=0.01, lease=LEASE)
+    for kind, handler in handlers.items():
+        runner.register(kind, handler)
+    runner.db = db
+    return runner
+
+
+async def expire_lease(db, job_id):
+    await db.jobs.update_one({"id": job_id}, {"$set": {"heartbeat_at": utcnow() - timedelta(seconds=LEASE + 1)}})
+
+
+@pytest.mark.anyio
+async def test_exclusive_enqueue_gets_one_job(db):
+    await exclusive_jobs(db)
+    runner = runner_for(db, sync=idle)
+    first = await runner.enqueue("sync", exclusive=True)
+    assert first is not None
+    assert await runner.enqueue("sync", exclusive=True) is None
+    assert (await runner.find_active("sync"))["id"] == first["id"]
+    assert await db.jobs.count_documents({}) == 1
+
+
+@pytest.mark.anyio
+async def test_stale_job_is_requeued_then_failed(db):
+    await exclusive_jobs(db)
+    runner = runner_for(db, sync=idle)
+    job = await runner.enqueue("sync", exclusive=True)
+
+    for attempt in range(1, JOB_MAX_ATTEMPTS + 1):
+        # A runner claims the job and dies without finishing it
+        claimed = await runner._claim()
+        assert claimed["id"] == job["id"] and claimed["attempts"] == attempt
+        # Still within its lease: left alone
+        assert await runner.recover_stale() == 0
+        await expire_lease(db, job["id"])
+        assert await runner.recover_stale() == 1
+        stored = await runner.get(job["id"])
+        if attempt < JOB_MAX_ATTEMPTS:
+            assert stored["status"] == JOB_PENDING
+            # Still the active job of its kind
+            assert await runner.enqueue("sync", exclusive=True) is None
+
+    assert stored["status"] == JOB_FAILED and stored["error"]
+    assert "active_kind" not in stored and "heartbeat_at" not in stored
+    # The exclusive lock is released
+    assert await runner.enqueue("sync", exclusive=True) is not None
+
+
+@pytest.mark.anyio
+async def test_failing_job_releases_the_lock_and_the_worker_goes_on(db):
+    await exclusive_jobs(db)
+
+    async def broken(job, report_progress):
+        raise RuntimeError("falhou")
+
+    runner = runner_for(db, broken=broken, sync=idle)
+    failing = await runner.enqueue("broken", exclusive=True)
+    succeeding = await runner.enqueue("sync", exclusive=True)
+    runner.start(db)
+    try:
+        for _ in range(200):
+            jobs = [await runner.get(failing["id"]), await runner.get(succeeding["id"])]
+            if all(job["status"] not in (JOB_PENDING, JOB_RUNNING) for job in jobs):
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await runner.stop()
+    assert [job["status"] for job in jobs] == [JOB_FAILED, JOB_SUCCEEDED]
+    assert jobs[0]["error"] == "falhou"
+    assert all("active_kind" not in job for job in jobs)
+    assert await runner.enqueue("broken", exclusive=True) is not None
+
+
+def test_instagram_sync_returns_the_active_job(client, auth_headers, monkeypatch):
+    async def setup():
+        await exclusive_jobs(server.db)
+        await server.db.settings.insert_one({
+            "id": "site_settings", "instagram_access_token": "token", "instagram_user_id": "17841400000000000",
+        })
+    client.portal.call(setup)
+
+    async def slow_sync(job, report_progress):
+        await asyncio.sleep(3600)
+    monkeypatch.setitem(server.job_runner.handlers, server.INSTAGRAM_SYNC_JOB, slow_sync)
+
+    first = client.post("/api/instagram/sync", headers=auth_headers)
+    second = client.post("/api/instagram/sync", headers=auth_headers)
+    assert first.status_code == second.status_code == 202
+    assert second.json()["job_id"] == first.json()["job_id"]
+    assert second.json()["message"] == "Sincronização já em andamento"
+    assert client.get(f"/api/jobs/{first.json()['job_id']}", headers=auth_headers).json()["kind"] == "instagram_sync"
@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from pagination import InvalidCursor, decode_cursor, encode_cursor, paginate
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 1, 18, 10, 0, 123000, tzinfo=timezone.utc)
+    cursor = encode_cursor({"id": "abc", "created_at": created_at})
+    assert decode_cursor(cursor) == (created_at, "abc")
+
+    cursor = encode_cursor({"id": "abc", "price": 49.9}, field="price")
+    assert decode_cursor(cursor, field="price") == (49.9, "abc")
+
+
+def test_cursor_rejects_other_orders_and_garbage():
+    cursor = encode_cursor({"id": "abc", "price": 10}, field="price")
+    with pytest.raises(InvalidCursor):
+        decode_cursor(cursor)
+    for garbage in ("zzz", "bnVsbA", ""):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(garbage)
+
+
+@pytest.mark.anyio
+async def test_paginate_visits_every_document_once(db):
+    # Ties on created_at are broken by id
+    same_time = datetime(2024, 5, 1, tzinfo=timezone.utc)
+    await db.cakes.insert_many([
+        {"id": f"cake-{n:02d}", "created_at": same_time if n % 3 == 0 else datetime(2024, 5, 1, n, tzinfo=timezone.utc)}
+        for n in range(11)
+    ])
+    for descending in (True, False):
+        seen, cursor = [], None
+        while True:
+            items, cursor = await paginate(db.cakes, {}, 4, cursor, {"_id": 0}, descending=descending)
+            seen.extend(items)
+            if cursor is None:
+                break
+        assert len(seen) == 11 and len({cake["id"] for cake in seen}) == 11
+        keys = [(cake["created_at"], cake["id"]) for cake in seen]
+        assert keys == sorted(keys, reverse=descending)
+
+
+def test_cake_pages_over_the_api(client):
+    client.post("/api/seed")
+    first = client.get("/api/cakes", params={"limit": 4}).json()
+    assert len(first["items"]) == 4 and first["next_cursor"]
+    second = client.get("/api/cakes", params={"limit": 4, "cursor": first["next_cursor"]}).json()
+    ids = [cake["id"] for cake in first["items"] + second["items"]]
+    assert len(ids) == len(set(ids))
+    assert second["next_cursor"] is None
+
+    assert client.get("/api/cakes", params={"cursor": "zzz"}).status_code == 400
+    # A price-ordered cursor can't continue a newest-first listing
+    by_price = client.get("/api/cakes", params={"limit": 2, "sort": "price_asc"}).json()
+    assert client.get("/api/cakes", params={"cursor": by_price["next_cursor"]}).status_code == 400
@@ -0,0 +1,25 @@
+import re
+
+import pytest
+
+import server
+
+UTC_Z = re.compile(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d+)?Z$")
+
+
+@pytest.mark.parametrize("fast_json", [False, True])
+def test_datetimes_use_z_on_every_route(client, auth_headers, monkeypatch, fast_json):
+    monkeypatch.setattr(server.app_settings, "FAST_JSON", fast_json)
+    client.post("/api/seed")
+    updated = client.put("/api/settings", headers=auth_headers, json={"logo_url": "https://cdn.example.com/logo.png"})
+
+    gallery = client.get("/api/gallery").json()
+    dates = [
+        client.get("/api/cakes").json()["items"][0]["created_at"],
+        gallery["cakes"]["items"][0]["created_at"],
+        gallery["categories"][0]["created_at"],
+        client.get("/api/settings").json()["updated_at"],
+        client.get("/api/settings/admin", headers=auth_headers).json()["updated_at"],
+        updated.json()["updated_at"],
+    ]
+    assert all(UTC_Z.match(value) for value in dates), dates
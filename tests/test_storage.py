@@ -0,0 +1,46 @@
+import asyncio
+import io
+
+import pytest
+from PIL import Image
+
+from storage import LocalBlobStore
+
+
+def png_bytes(size=(8, 8)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@pytest.mark.anyio
+async def test_concurrent_puts_of_the_same_bytes(tmp_path):
+    store = LocalBlobStore(str(tmp_path))
+    for attempt in range(20):
+        data = png_bytes((8 + attempt, 8))
+        blobs = await asyncio.gather(*(store.put(data, "image/png") for _ in range(4)))
+        assert len({blob.key for blob in blobs}) == 1
+        info = await store.stat(blobs[0].key)
+        assert (info.content_type, info.size) == ("image/png", len(data))
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_upload_types_come_from_the_bytes(client, auth_headers):
+    png = png_bytes()
+    # The client calls it a JPEG; the bytes say PNG
+    response = client.post("/api/upload", headers=auth_headers, files={"file": ("bolo.jpg", png, "image/jpeg")})
+    assert response.status_code == 200, response.text
+    image = client.get(response.json()["url"])
+    assert image.content == png
+    assert image.headers["content-type"] == "image/png"
+    assert image.headers["x-content-type-options"] == "nosniff"
+    variant = client.get(response.json()["images"]["card"]["webp"])
+    assert variant.headers["x-content-type-options"] == "nosniff"
+
+    for name, data, content_type in (
+        ("a.html", b"<html><script>alert(1)</script></html>", "image/png"),
+        ("a.svg", b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>', "image/svg+xml"),
+        ("a.png", b"\x89PNG truncated", "image/png"),
+    ):
+        response = client.post("/api/upload", headers=auth_headers, files={"file": (name, data, content_type)})
+        assert response.status_code == 400, name